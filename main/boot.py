@@ -4,3 +4,7 @@
 # import webrepl
 # webrepl.start()
 
+# record what every module import costs on the heap (functions/memdiag.py)
+from functions import memdiag
+
+memdiag.trace_imports()
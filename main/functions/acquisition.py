@@ -0,0 +1,64 @@
+import time
+
+import _thread
+from functions import scheduler
+
+# ======================================================
+# Settings
+# ======================================================
+USE_THREAD = False  # sample sensors in a second thread instead of a timer
+POLL_MS = 5  # sleep between scheduler polls in the acquisition thread
+STACK_SIZE = 8192
+
+_running = False
+_stopped = True
+_errors = 0
+
+
+def _loop():
+    """Run the timer wheel's tasks until stop() is called."""
+    global _stopped, _errors
+    while _running:
+        try:
+            scheduler.run_pending()
+        except Exception as e:  # keep sampling if one task fails
+            _errors += 1
+            print("acquisition:", e)
+        time.sleep_ms(POLL_MS)
+    _stopped = True
+
+
+def start():
+    """Move all scheduler tasks to a sensor acquisition thread.
+
+    Tasks publish into functions.state; the render loop reads it through
+    Snapshot.take(), which retries instead of locking, so neither side
+    waits for the other. On the ESP32 port MicroPython threads share one
+    core under the GIL, so the gain comes from sensor waits no longer
+    stalling frames rather than from true parallel execution.
+    """
+    global _running, _stopped
+    if _running:
+        return
+    scheduler.stop()
+    _running = True
+    _stopped = False
+    try:
+        _thread.stack_size(STACK_SIZE)
+    except (AttributeError, ValueError):
+        pass
+    _thread.start_new_thread(_loop, ())
+
+
+def stop(timeout_ms=1000):
+    """Stop the acquisition thread and wait for it to exit."""
+    global _running
+    _running = False
+    deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+    while not _stopped and time.ticks_diff(deadline, time.ticks_ms()) > 0:
+        time.sleep_ms(POLL_MS)
+
+
+def errors():
+    """Return how many task exceptions the thread has swallowed."""
+    return _errors
@@ -0,0 +1,215 @@
+import time
+from heapq import heappop, heappush
+
+from functions import scheduler
+
+# ======================================================
+# Settings
+# ======================================================
+CHECK_INTERVAL = 500  # ms between rule evaluations
+BLINK_MS = 400  # half period of blinking alerts
+REARM_MS = 60000  # a cleared alert stays quiet at least this long
+LOW_FUEL_ON = 2.5  # L, raised below this
+LOW_FUEL_OFF = 3.5  # L, cleared above this
+LOW_FUEL_HOLD_MS = 10000  # fuel sloshes: must stay low this long
+ICE_ON = 3  # C, raised at or below this
+ICE_OFF = 5  # C, cleared at or above this
+NOT_CALIB_SHOW_MS = 10000  # a missing calibration is only a reminder
+
+_rules = []
+_heap = []  # (-priority, activation number, rule); stale entries linger
+_activations = 0
+blink_on = True  # flipped by the "blink" task
+
+
+class Rule:
+    """One alert condition with hysteresis, hold time and rate limit.
+
+    read() returns the watched value or None when it is unknown. The
+    alert is raised once raise_(value) has held for hold_ms and at
+    least gap_ms after it last cleared, and clears on clear(value).
+    With show_ms it leaves the banner after that long, and comes back
+    only when it clears and is raised again.
+    """
+
+    __slots__ = (
+        "name",
+        "priority",
+        "text",
+        "read",
+        "raise_",
+        "clear",
+        "blink",
+        "hold_ms",
+        "gap_ms",
+        "show_ms",
+        "active",
+        "number",
+        "_since",
+        "_cleared",
+        "_raised",
+    )
+
+    def __init__(
+        self,
+        name,
+        priority,
+        text,
+        read,
+        raise_,
+        clear,
+        blink=False,
+        hold_ms=0,
+        gap_ms=REARM_MS,
+        show_ms=0,
+    ):
+        self.name = name
+        self.priority = priority
+        self.text = text
+        self.read = read
+        self.raise_ = raise_
+        self.clear = clear
+        self.blink = blink
+        self.hold_ms = hold_ms
+        self.gap_ms = gap_ms
+        self.show_ms = show_ms
+        self.active = False
+        self.number = 0
+        self._since = None
+        self._cleared = None
+        self._raised = 0
+
+    def shown(self, now):
+        """Return True while the active alert belongs on the banner."""
+        return self.active and (
+            not self.show_ms
+            or time.ticks_diff(now, self._raised) < self.show_ms
+        )
+
+    def check(self, now):
+        """Update the state; return True when the alert was just raised."""
+        value = self.read()
+        if self.active:
+            if value is None or self.clear(value):
+                self.active = False
+                self._cleared = now
+            return False
+        if value is None or not self.raise_(value):
+            self._since = None
+            return False
+        if self._since is None:
+            self._since = now
+        if time.ticks_diff(now, self._since) < self.hold_ms:
+            return False
+        if (
+            self._cleared is not None
+            and time.ticks_diff(now, self._cleared) < self.gap_ms
+        ):
+            return False
+        self.active = True
+        self._since = None
+        self._raised = now
+        return True
+
+
+def add_rule(rule):
+    _rules.append(rule)
+
+
+def check():
+    """Scheduler task: evaluate every rule, queue the ones just raised."""
+    global _activations
+    now = time.ticks_ms()
+    for rule in _rules:
+        if rule.check(now):
+            _activations += 1
+            rule.number = _activations
+            heappush(_heap, (-rule.priority, rule.number, rule))
+
+
+def top():
+    """Return the most important rule to show, or None."""
+    heap = _heap
+    now = time.ticks_ms()
+    while heap:
+        _, number, rule = heap[0]
+        if rule.number == number and rule.shown(now):
+            return rule
+        heappop(heap)  # cleared, timed out or raised again since
+    return None
+
+
+def _blink():
+    global blink_on
+    blink_on = not blink_on
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) else None
+
+
+def setup(get_fuel, get_temperature_c, monitor):
+    """Register the built-in rules and start evaluating them.
+
+    get_fuel() returns litres or a status string such as "not calib",
+    get_temperature_c() degrees or None, monitor is the supply's
+    VoltageMonitor, whose alarm flags already have hysteresis.
+    """
+    add_rule(
+        Rule(
+            "over_voltage",
+            100,
+            "CHARGING FAULT",
+            lambda: monitor.over,
+            bool,
+            lambda v: not v,
+            blink=True,
+            gap_ms=0,
+        )
+    )
+    add_rule(
+        Rule(
+            "under_voltage",
+            90,
+            "LOW BATTERY",
+            lambda: monitor.under,
+            bool,
+            lambda v: not v,
+            blink=True,
+            gap_ms=0,
+        )
+    )
+    add_rule(
+        Rule(
+            "low_fuel",
+            60,
+            "LOW FUEL",
+            lambda: _number(get_fuel()),
+            lambda v: v < LOW_FUEL_ON,
+            lambda v: v > LOW_FUEL_OFF,
+            hold_ms=LOW_FUEL_HOLD_MS,
+        )
+    )
+    add_rule(
+        Rule(
+            "ice",
+            50,
+            "ICE RISK",
+            get_temperature_c,
+            lambda v: v <= ICE_ON,
+            lambda v: v >= ICE_OFF,
+        )
+    )
+    add_rule(
+        Rule(
+            "not_calib",
+            10,
+            "FUEL NOT CALIB",
+            lambda: get_fuel() == "not calib",
+            bool,
+            lambda v: not v,
+            show_ms=NOT_CALIB_SHOW_MS,
+        )
+    )
+    scheduler.add_task("alerts", check, CHECK_INTERVAL)
+    scheduler.add_task("blink", _blink, BLINK_MS)
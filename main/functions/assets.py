@@ -0,0 +1,141 @@
+import struct
+
+# ======================================================
+# Settings
+# ======================================================
+PACK_FILE = "pictures/assets.pack"  # built by tools/asset_compiler.py
+BAND_ROWS = 10  # rows per readinto() when streaming raw assets
+
+_MAGIC = b"RGBP"
+_HEADER = "<4sHH"
+_ENTRY = "<16sHHBxxxII"
+_ENC_RAW = 0
+_ENC_RLE = 1
+
+
+def _unrle(src, dst):
+    """Expand an RLE stream (see tools/asset_compiler.py) into dst."""
+    i = o = 0
+    n = len(src)
+    while i < n:
+        c = src[i]
+        i += 1
+        if c < 0x80:
+            k = (c + 1) * 2
+            dst[o : o + k] = src[i : i + k]
+            i += k
+        else:
+            k = (c - 0x7D) * 2
+            dst[o : o + k] = bytes(src[i : i + 2]) * (k // 2)
+            i += 2
+        o += k
+    return o
+
+
+class AssetPack:
+    """Pre-decoded RGB565 pictures streamed from one indexed pack file."""
+
+    def __init__(self, tft, path=PACK_FILE):
+        self.tft = tft
+        self._file = open(path, "rb")
+        magic, version, count = struct.unpack(
+            _HEADER, self._file.read(struct.calcsize(_HEADER))
+        )
+        if magic != _MAGIC or version != 1:
+            raise ValueError("bad asset pack")
+
+        self._index = {}
+        entry_size = struct.calcsize(_ENTRY)
+        for _ in range(count):
+            name, w, h, enc, offset, size = struct.unpack(
+                _ENTRY, self._file.read(entry_size)
+            )
+            name = name.rstrip(b"\x00").decode()
+            self._index[name] = (w, h, enc, offset, size)
+
+        self._sprites = {}  # name -> decoded pixels kept in RAM
+        self._buf = None  # shared decode buffer, allocated on first use
+        self._band = None  # shared band buffer for raw streaming
+
+    def size(self, name):
+        """Return (width, height) of an asset."""
+        w, h, _, _, _ = self._index[name]
+        return w, h
+
+    def load(self, name, buf=None):
+        """Decode an asset into buf (or the shared buffer) and return it."""
+        w, h, enc, offset, size = self._index[name]
+        need = w * h * 2
+        if buf is None:
+            if self._buf is None or len(self._buf) < need:
+                self._buf = bytearray(
+                    max(a[0] * a[1] * 2 for a in self._index.values())
+                )
+            buf = self._buf
+        dst = memoryview(buf)[:need]
+
+        self._file.seek(offset)
+        if enc == _ENC_RAW:
+            self._file.readinto(dst)
+        else:
+            src = bytearray(size)
+            self._file.readinto(src)
+            _unrle(memoryview(src), dst)
+        return dst
+
+    def cache(self, name):
+        """Keep an asset decoded in RAM so blits become a memory copy."""
+        if name not in self._sprites:
+            w, h = self.size(name)
+            self._sprites[name] = self.load(name, bytearray(w * h * 2))
+        return self._sprites[name]
+
+    def release(self, name):
+        """Drop a cached asset."""
+        self._sprites.pop(name, None)
+
+    def blit(self, name, x=0, y=0):
+        """Copy an asset into the framebuffer at (x, y)."""
+        w, h, enc, offset, _ = self._index[name]
+        sprite = self._sprites.get(name)
+        if sprite is not None:
+            self.tft.blit_buffer(sprite, x, y, w, h)
+        elif enc == _ENC_RAW:
+            self._stream(w, h, offset, x, y)
+        else:
+            self.tft.blit_buffer(self.load(name), x, y, w, h)
+
+    def blit_rows(self, name, first, count, x=0, y=0):
+        """Copy rows first..first+count of an asset drawn at (x, y).
+
+        Repairs a band of a background after an overlay without
+        redrawing the rest of the screen.
+        """
+        w, h, enc, offset, _ = self._index[name]
+        count = min(count, h - first)
+        if count <= 0:
+            return
+        stride = w * 2
+        sprite = self._sprites.get(name)
+        if sprite is None and enc == _ENC_RAW:
+            self._stream(w, count, offset + first * stride, x, y + first)
+            return
+        if sprite is None:
+            sprite = self.load(name)
+        rows = memoryview(sprite)[first * stride : (first + count) * stride]
+        self.tft.blit_buffer(rows, x, y + first, w, count)
+
+    def _stream(self, w, h, offset, x, y):
+        """Stream a raw asset band by band through a small buffer."""
+        stride = w * 2
+        if self._band is None or len(self._band) < stride * BAND_ROWS:
+            self._band = bytearray(stride * BAND_ROWS)
+        band = memoryview(self._band)
+        self._file.seek(offset)
+        row = 0
+        while row < h:
+            rows = min(BAND_ROWS, h - row)
+            chunk = band[: rows * stride]
+            self._file.readinto(chunk)
+            self.tft.blit_buffer(chunk, x, y + row, w, rows)
+            row += rows
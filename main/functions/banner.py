@@ -0,0 +1,55 @@
+import s3lcd
+from functions import alerts, palette
+from functions.markup import draw_text, tft
+
+_UNSET = object()
+
+
+class Banner:
+    """The most important active alert, drawn over a full-width band.
+
+    Only the band is ever drawn: the page stops drawing the items under
+    it while an alert is up, and repaints just the band when the last
+    alert clears. Blinking alerts swap colours on the alerts blink
+    timer.
+    """
+
+    def __init__(self, font, y=0, height=36, fc=s3lcd.WHITE, bc=s3lcd.RED):
+        self.font = font
+        self.y = y
+        self.height = height
+        self.fc = fc
+        self.bc = bc
+        self.invalidate()
+
+    def invalidate(self):
+        """Draw again on the next call, e.g. after the page was redrawn."""
+        self._shown = _UNSET
+        self._phase = None
+
+    def draw(self, page, assets):
+        """Bring the band up to date; return True if anything was drawn."""
+        rule = alerts.top()
+        phase = alerts.blink_on if rule is not None and rule.blink else True
+        if rule is self._shown and phase == self._phase:
+            return False
+        shown = self._shown
+        self._shown, self._phase = rule, phase
+        if rule is None:
+            if shown is _UNSET:
+                return False  # the page was just drawn without a banner
+            page.uncover(assets)
+            return True
+        if shown is None or shown is _UNSET:
+            page.cover(self.y, self.height)
+        fc, bc = palette.color(self.fc), palette.color(self.bc)
+        if not phase:
+            fc, bc = bc, palette.color(s3lcd.BLACK)
+        w = tft.width()
+        tft.fill_rect(0, self.y, w, self.height, bc)
+        font = self.font
+        text = rule.text[: w // font.WIDTH]
+        x = (w - len(text) * font.WIDTH) // 2
+        y = self.y + (self.height - font.HEIGHT) // 2
+        draw_text(font, text, x, y, fc, bc)
+        return True
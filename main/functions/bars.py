@@ -0,0 +1,51 @@
+from functions import palette
+from functions.markup import tft
+
+
+class BarChart:
+    """Vertical bars scaled to the largest value, for histogram pages.
+
+    Bars are pitch pixels apart and redrawn only when their height in
+    pixels changes. Call invalidate() after anything else has drawn
+    over the chart.
+    """
+
+    def __init__(self, count, pitch, width, height, fc, bc, x=0, y=0):
+        self.count = count
+        self.pitch = pitch
+        self.bar_width = width
+        self.height = height
+        self.width = (count - 1) * pitch + width
+        self.fc = fc
+        self.bc = bc
+        self.x = x
+        self.y = y
+        self.invalidate()
+
+    def place(self, x, y):
+        self.x = x
+        self.y = y
+        self.invalidate()
+
+    def invalidate(self):
+        """Force a full redraw on the next draw() call."""
+        self._shown = None
+
+    def draw(self, values):
+        """Draw a sequence of count non-negative numbers."""
+        fc, bc = palette.color(self.fc), palette.color(self.bc)
+        if self._shown is None:
+            tft.fill_rect(self.x, self.y, self.width, self.height, bc)
+            self._shown = [0] * self.count
+        top = max(values) or 1
+        w, h = self.bar_width, self.height
+        for i in range(self.count):
+            bar = values[i] * h // top
+            if values[i] and not bar:
+                bar = 1  # keep rare but non-zero bins visible
+            if bar == self._shown[i]:
+                continue
+            x = self.x + i * self.pitch
+            tft.fill_rect(x, self.y, w, h - bar, bc)
+            tft.fill_rect(x, self.y + h - bar, w, bar, fc)
+            self._shown[i] = bar
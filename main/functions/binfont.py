@@ -0,0 +1,160 @@
+import struct
+
+import micropython
+
+# ======================================================
+# Settings
+# ======================================================
+BIG_FONT = "fonts/vga2_bold_16x32.fnt"  # built by tools/font_compiler.py
+SMALL_FONT = "fonts/vga1_8x8.fnt"
+# 1-bit glyphs kept per font (64 B each in the big font, 6 KB in all);
+# colours are applied at blit time, so one entry serves every colour
+CACHE_SIZE = 96
+MISSING = "?"  # drawn for characters not present in the font
+
+_MAGIC = b"BFNT"
+_HEADER = "<4sBBBBH"
+_INDEX = "<BIH"
+_FLAG_RLE = 0x01
+
+_fonts = {}
+
+
+def _unrle(src, dst):
+    """Expand an RLE glyph (see tools/font_compiler.py) into dst."""
+    i = o = 0
+    n = len(src)
+    while i < n:
+        c = src[i]
+        i += 1
+        if c < 0x80:
+            k = c + 1
+            dst[o : o + k] = src[i : i + k]
+            i += k
+        else:
+            k = c - 0x7D
+            v = src[i]
+            for j in range(o, o + k):
+                dst[j] = v
+            i += 1
+        o += k
+
+
+@micropython.native
+def _expand(bits, width, fg, bg, out):
+    """Write a 1-bit bitmap into out as little-endian RGB565 pixels."""
+    fl, fh, bl, bh = fg & 0xFF, fg >> 8, bg & 0xFF, bg >> 8
+    row_bytes = (width + 7) // 8
+    o = 0
+    for i in range(len(bits)):
+        byte = bits[i]
+        for bit in range(min(8, width - (i % row_bytes) * 8)):
+            if byte & (0x80 >> bit):
+                out[o] = fl
+                out[o + 1] = fh
+            else:
+                out[o] = bl
+                out[o + 1] = bh
+            o += 2
+
+
+class BinFont:
+    """Bitmap font read lazily from a binary file built by font_compiler.
+
+    Only the header and glyph index are loaded up front. Glyphs are read
+    on first use and kept as 1-bit bitmaps in an LRU cache keyed by
+    character; each draw expands one into a shared RGB565 buffer in
+    the requested colours. A hit only stamps the entry; the least
+    recently used one is looked for on a miss with a full cache.
+    """
+
+    def __init__(self, path, cache_size=CACHE_SIZE, preload=False):
+        f = open(path, "rb")
+        header = struct.unpack(_HEADER, f.read(struct.calcsize(_HEADER)))
+        magic, version, self.WIDTH, self.HEIGHT, flags, count = header
+        if magic != _MAGIC or version != 1:
+            raise ValueError("bad font file")
+
+        self._rle = bool(flags & _FLAG_RLE)
+        self._index = {}
+        entry_size = struct.calcsize(_INDEX)
+        for _ in range(count):
+            code, offset, size = struct.unpack(_INDEX, f.read(entry_size))
+            self._index[chr(code)] = (offset, size)
+
+        if preload:
+            f.seek(0)
+            self._data = memoryview(f.read())
+            f.close()
+            self._file = None
+        else:
+            self._data = None
+            self._file = f
+
+        self._bits = bytearray(((self.WIDTH + 7) // 8) * self.HEIGHT)
+        self._raw = bytearray(len(self._bits) * 2)  # worst-case RLE size
+        self._pixels = bytearray(self.WIDTH * self.HEIGHT * 2)
+        self.cache_size = cache_size
+        self._cache = {}  # character -> [bitmap, last use]
+        self._uses = 0
+
+    def __contains__(self, ch):
+        return ch in self._index
+
+    def _read_bits(self, ch):
+        """Load the 1-bit bitmap of a glyph into the shared bits buffer."""
+        entry = self._index.get(ch) or self._index.get(MISSING)
+        if entry is None:
+            for i in range(len(self._bits)):
+                self._bits[i] = 0
+            return self._bits
+        offset, size = entry
+        if self._data is not None:
+            src = self._data[offset : offset + size]
+        else:
+            src = memoryview(self._raw)[:size]
+            self._file.seek(offset)
+            self._file.readinto(src)
+        if self._rle:
+            _unrle(src, self._bits)
+        else:
+            self._bits[:] = src
+        return self._bits
+
+    def _bitmap(self, ch):
+        """Return the 1-bit bitmap of a glyph, using the LRU cache."""
+        self._uses += 1
+        entry = self._cache.get(ch)
+        if entry is not None:
+            entry[1] = self._uses
+            return entry[0]
+
+        cache = self._cache
+        if len(cache) >= self.cache_size:
+            oldest = min(cache, key=lambda k: cache[k][1])
+            bits = cache.pop(oldest)[0]
+            bits[:] = self._read_bits(ch)
+        else:
+            bits = bytearray(self._read_bits(ch))
+        cache[ch] = [bits, self._uses]
+        return bits
+
+    def glyph(self, ch, fg, bg):
+        """Return a glyph as RGB565 pixels, valid until the next call."""
+        _expand(self._bitmap(ch), self.WIDTH, fg, bg, self._pixels)
+        return self._pixels
+
+    def text(self, tft, text, x, y, fg, bg):
+        """Draw a string one cached glyph at a time."""
+        w, h = self.WIDTH, self.HEIGHT
+        for ch in text:
+            tft.blit_buffer(self.glyph(ch, fg, bg), x, y, w, h)
+            x += w
+
+
+def load_font(path, **kwargs):
+    """Return a shared BinFont instance for path."""
+    font = _fonts.get(path)
+    if font is None:
+        font = _fonts[path] = BinFont(path, **kwargs)
+    return font
@@ -1,58 +1,91 @@
-import time
+from array import array
 
 from machine import ADC, PWM, Pin
 from tft_drivers.tft_config import BACKLIGHT
 
+# ======================================================
+# Settings
+# ======================================================
 PHOTO_PIN = 18
 MIN_BRIGHTNESS = 50  # min — background light
 MAX_BRIGHTNESS = 1023  # max - background light
-UPDATE_INTERVAL = 100  # update every 0.1 seconds
-STEP = 50  # step for update
+UPDATE_INTERVAL = 40  # ms between fade steps
+PWM_FREQ = 20000  # Hz, no flicker on cameras and nothing audible
+LIGHT_SHIFT = 3  # EMA weight 1/8 per photoresistor sample
+DARK_READING = 100  # ADC reading treated as complete darkness
+LUT_BITS = 6  # 64-entry light -> duty table
+GAMMA = 2.2  # perceived brightness ~ duty ** (1 / GAMMA)
+ATTACK_MS = 400  # time constant when brightening (leaving a tunnel)
+RELEASE_MS = 4000  # time constant when dimming (tree shadows pass by)
+NIGHT_ON = 300  # filtered reading below which the night palette is used
+NIGHT_OFF = 600  # and above which the day palette returns
+FADE_SHIFT = 8  # fixed-point fraction bits of the fading duty
+
+
+def _build_lut():
+    """Precompute duty for every light step along the gamma curve."""
+    lut = array("H", [0] * (1 << LUT_BITS))
+    top = len(lut) - 1
+    span = MAX_BRIGHTNESS - MIN_BRIGHTNESS
+    for i in range(len(lut)):
+        reading = i * 4095 // top
+        level = max(0, reading - DARK_READING) / (4095 - DARK_READING)
+        lut[i] = MIN_BRIGHTNESS + int(span * level**GAMMA + 0.5)
+    return lut
+
 
 photo_adc = ADC(Pin(PHOTO_PIN))
 photo_adc.atten(ADC.ATTN_11DB)
 backlight_pwm = PWM(BACKLIGHT)
-backlight_pwm.freq(1000)
+backlight_pwm.freq(PWM_FREQ)
 
-_last_update = time.ticks_ms()
+_lut = _build_lut()
+_light = photo_adc.read()  # filtered reading, 0–4095
+_fade = 0  # duty << FADE_SHIFT
 _current_brightness = 0  # current value PWM
+_night = False
 
 
-def _map(x, in_min, in_max, out_min, out_max):
-    return int(
-        (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
-    )
+def update_brightness():
+    """Scheduler task: filter the light, look up the duty and fade to it."""
+    global _light, _fade, _current_brightness, _night
 
+    _light += (photo_adc.read() - _light) >> LIGHT_SHIFT
+    target = _lut[_light >> (12 - LUT_BITS)] << FADE_SHIFT
 
-def update_brightness():
-    global _last_update, _current_brightness
-
-    if time.ticks_diff(time.ticks_ms(), _last_update) < UPDATE_INTERVAL:
-        return
-
-    light_value = photo_adc.read()  # 0–4095
-    target_brightness = _map(
-        light_value, 100, 4095, MIN_BRIGHTNESS, MAX_BRIGHTNESS
-    )
-    target_brightness = max(
-        MIN_BRIGHTNESS, min(MAX_BRIGHTNESS, target_brightness)
-    )
-
-    # move to current value
-    if _current_brightness < target_brightness:
-        _current_brightness = min(
-            _current_brightness + STEP, target_brightness
-        )
-    elif _current_brightness > target_brightness:
-        _current_brightness = max(
-            _current_brightness - STEP, target_brightness
-        )
+    # first-order approach with separate attack and release time constants
+    diff = target - _fade
+    tau = ATTACK_MS if diff > 0 else RELEASE_MS
+    step = diff * UPDATE_INTERVAL // tau
+    if not step and diff:
+        step = 1 if diff > 0 else -1
+    _fade += step
 
-    backlight_pwm.duty(_current_brightness)
-    _last_update = time.ticks_ms()
+    duty = _fade >> FADE_SHIFT
+    if duty != _current_brightness:
+        _current_brightness = duty
+        backlight_pwm.duty(duty)
+
+    if _night:
+        _night = _light < NIGHT_OFF
+    else:
+        _night = _light < NIGHT_ON
+
+
+def is_night():
+    """Return True while the ambient light calls for the night palette."""
+    return _night
 
 
 def set_brightness(level):
-    global _current_brightness
+    """Set the duty at once; update_brightness() fades on from there."""
+    global _current_brightness, _fade
     _current_brightness = int(max(0, min(1023, level)))
+    _fade = _current_brightness << FADE_SHIFT
+    backlight_pwm.duty(_current_brightness)
+
+
+def reapply_pwm(cpu_freq=None):
+    """Governor hook: restore the backlight PWM after a clock change."""
+    backlight_pwm.freq(PWM_FREQ)
     backlight_pwm.duty(_current_brightness)
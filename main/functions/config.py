@@ -0,0 +1,127 @@
+import math
+import struct
+from binascii import crc32
+
+# ======================================================
+# Settings
+# ======================================================
+CONFIG_FILE = "../config.bin"
+MAGIC = b"CONF"
+VERSION = 1
+MM_SHIFT = 16  # fraction bits of mm_per_pulse_q
+
+# name, struct code, default, min, max, step, divisor, label; values
+# are stored as integers and seen divided by divisor
+FIELDS = (
+    ("wheel_width", "H", 120, 80, 300, 5, 1, "Tyre mm"),
+    ("wheel_height", "B", 60, 25, 100, 5, 1, "Profile %"),
+    ("wheel_diameter", "B", 17, 10, 23, 1, 1, "Rim inch"),
+    ("pulses_per_rev", "B", 1, 1, 60, 1, 1, "Pulses/rev"),
+    ("full_fuel", "B", 17, 5, 40, 1, 1, "Tank L"),
+    ("flow_track", "H", 40, 20, 200, 5, 10, "Hwy L/100"),
+    ("flow_city", "H", 70, 20, 200, 5, 10, "City L/100"),
+)
+RECORD = "<" + "".join(f[1] for f in FIELDS)
+HEADER = "<4sBB"  # magic, version, field count
+HEADER_SIZE = struct.calcsize(HEADER)
+SIZE = HEADER_SIZE + struct.calcsize(RECORD) + 4  # CRC-32 at the end
+
+
+class Config:
+    """Editable settings and the constants derived from them.
+
+    Every field of FIELDS is a plain attribute, and apply() recomputes
+    the derived ones, so readers in the hot path pay one attribute
+    lookup and no arithmetic:
+
+    wheel_circumference  m
+    m_per_pulse          m of travel per wheel sensor pulse
+    mm_per_pulse_q       the same in mm, fixed point with MM_SHIFT bits
+    kph_per_hz           km/h for one pulse per second
+    km_per_l_track       100 / highway consumption
+    km_per_l_city        100 / city consumption
+    """
+
+    def __init__(self):
+        self.raw = [f[2] for f in FIELDS]
+        self._listeners = []
+        self.apply()
+
+    def add_listener(self, fn):
+        """Call fn(config) after every apply(), e.g. from the menu."""
+        self._listeners.append(fn)
+
+    def apply(self):
+        for (name, _, _, _, _, _, div, _), raw in zip(FIELDS, self.raw):
+            setattr(self, name, raw / div if div != 1 else raw)
+        self.wheel_circumference = math.pi * (
+            (
+                self.wheel_diameter * 25.4
+                + 2 * (self.wheel_width * self.wheel_height / 100)
+            )
+            / 1000
+        )
+        self.m_per_pulse = self.wheel_circumference / self.pulses_per_rev
+        self.mm_per_pulse_q = round(self.m_per_pulse * (1000 << MM_SHIFT))
+        self.kph_per_hz = self.m_per_pulse * 3.6
+        self.km_per_l_track = 100 / self.flow_track
+        self.km_per_l_city = 100 / self.flow_city
+        for fn in self._listeners:
+            fn(self)
+
+    # --------------------------
+    # Editing
+    # --------------------------
+    def text(self, i):
+        """Value of field i as shown in the menu."""
+        div = FIELDS[i][6]
+        return str(self.raw[i]) if div == 1 else f"{self.raw[i] / div:.1f}"
+
+    def step(self, i):
+        """Advance field i by its step, wrapping from max to min."""
+        _, _, _, low, high, step, _, _ = FIELDS[i]
+        value = self.raw[i] + step
+        self.raw[i] = low if value > high else value
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def load(self):
+        """Read CONFIG_FILE; keep defaults if it is missing or invalid."""
+        try:
+            with open(CONFIG_FILE, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) != SIZE:
+            return False
+        magic, version, count = struct.unpack_from(HEADER, data, 0)
+        if (magic, version, count) != (MAGIC, VERSION, len(FIELDS)):
+            return False
+        (crc,) = struct.unpack_from("<I", data, SIZE - 4)
+        if crc32(data[: SIZE - 4]) != crc:
+            return False
+        values = struct.unpack_from(RECORD, data, HEADER_SIZE)
+        for (_, _, _, low, high, _, _, _), value in zip(FIELDS, values):
+            if not low <= value <= high:
+                return False
+        self.raw = list(values)
+        self.apply()
+        return True
+
+    def save(self):
+        """Write CONFIG_FILE; return False if the flash write failed."""
+        buf = bytearray(SIZE)
+        struct.pack_into(HEADER, buf, 0, MAGIC, VERSION, len(FIELDS))
+        struct.pack_into(RECORD, buf, HEADER_SIZE, *self.raw)
+        struct.pack_into("<I", buf, SIZE - 4, crc32(buf[: SIZE - 4]))
+        try:
+            with open(CONFIG_FILE, "wb") as f:
+                f.write(buf)
+        except OSError:
+            return False
+        return True
+
+
+config = Config()
+config.load()
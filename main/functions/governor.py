@@ -0,0 +1,108 @@
+import machine
+
+# ======================================================
+# Settings
+# ======================================================
+FREQS = (80_000_000, 160_000_000, 240_000_000)  # ESP32-S3 CPU steps
+WINDOW_MS = 500  # governor decision period
+UP_LOAD = 75  # % busy at the current clock that forces a step up
+DOWN_LOAD = 45  # % busy a lower step may run at before stepping down
+DOWN_HOLD = 4  # calm windows in a row before stepping down
+TARGET_FRAME_US = 40000  # slowest acceptable frame; missing it jumps to max
+
+
+class Governor:
+    """Pick the CPU clock from measured busy/idle time with hysteresis.
+
+    The render loop reports the wall time of every frame and idle sleep.
+    Scheduler tasks that run inside a frame are part of its wall time;
+    those that run during a sleep are reported with it and count as
+    busy, not idle. update() runs once per window, decides and applies the
+    frequency. Stepping down is judged on the load projected at the
+    lower clock and stepping up happens at the window end, but input
+    and a missed frame target jump straight to the highest step at once
+    through boost().
+    """
+
+    def __init__(self, set_freq=machine.freq, freqs=FREQS):
+        self.freqs = freqs
+        self.level = len(freqs) - 1
+        self._set_freq = set_freq
+        self._hooks = []
+        self._busy = 0
+        self._idle = 0
+        self._worst_frame = 0
+        self._calm = 0
+        self.load = 0
+
+    @property
+    def freq(self):
+        return self.freqs[self.level]
+
+    def add_hook(self, fn):
+        """Call fn(freq) after every frequency change."""
+        self._hooks.append(fn)
+
+    def frame(self, busy_us, idle_us=0):
+        """Account one frame of the render loop."""
+        self._busy += busy_us
+        self._idle += idle_us
+        if busy_us > self._worst_frame:
+            self._worst_frame = busy_us
+        if busy_us > TARGET_FRAME_US:
+            self.boost()
+
+    def idle(self, idle_us, task_us=0):
+        """Account a sleep outside a frame; task_us of it ran tasks."""
+        task_us = min(task_us, idle_us)
+        self._busy += task_us
+        self._idle += idle_us - task_us
+
+    def boost(self):
+        """Jump to the highest step now, e.g. on a button press."""
+        self._calm = 0
+        self._apply(len(self.freqs) - 1)
+
+    def _apply(self, level):
+        if level != self.level:
+            self.level = level
+            self._set_freq(self.freqs[level])
+            for fn in self._hooks:
+                fn(self.freqs[level])
+
+    def update(self):
+        """Close the window, choose the next frequency and apply it."""
+        total = self._busy + self._idle
+        busy = self._busy
+        worst = self._worst_frame
+        self._busy = self._idle = self._worst_frame = 0
+        if not total:  # render loop blocked (menu, sleep): keep the clock
+            return self.freqs[self.level]
+        self.load = busy * 100 // total
+
+        level = self.level
+        top = len(self.freqs) - 1
+        if worst > TARGET_FRAME_US:
+            level = top
+            self._calm = 0
+        elif self.load > UP_LOAD and level < top:
+            level += 1
+            self._calm = 0
+        elif level > 0:
+            lower = self.freqs[level - 1]
+            projected = self.load * self.freqs[level] // lower
+            worst_lower = worst * self.freqs[level] // lower
+            if projected < DOWN_LOAD and worst_lower < TARGET_FRAME_US:
+                self._calm += 1
+                if self._calm >= DOWN_HOLD:
+                    level -= 1
+                    self._calm = 0
+            else:
+                self._calm = 0
+
+        self._apply(level)
+        return self.freqs[level]
+
+    def tick(self):
+        """Scheduler task: one decision per WINDOW_MS."""
+        self.update()
@@ -1,29 +1,60 @@
-import math
+import os
+import struct
 import time
 
 import dht
 import functions.urtc as urtc
 import ujson
-from machine import ADC, I2C, Pin, Timer
+from functions import (
+    histograms,
+    powerloss,
+    recovery,
+    scheduler,
+    telemetry,
+    trips,
+)
+from functions.config import MM_SHIFT, config
+from functions.pulse_counter import make_counter
+from functions.state import (
+    FUEL,
+    GEAR,
+    HUMIDITY,
+    RANGE,
+    SPEED,
+    TEMPERATURE,
+    TIME,
+    TRIP,
+    VOLTAGE,
+    state,
+)
+from functions.voltage import VoltageMonitor
+from machine import ADC, I2C, Pin
 
 # ======================================================
 # Settings
 # ======================================================
-WHEEL_WIDTH = 120  # mm
-WHEEL_HEIGHT = 60  # % of width
-WHEEL_DIAMETER = 17  # wheel diameter (inches)
-FULL_FUEL = 17  # fuel tank capacity (liters)
-FUEL_FLOW_TRACK = 4  # fuel consumption on highway (L/100km)
-FUEL_FLOW_CITY = 7  # fuel consumption in city (L/100km)
-
-WHEEL_CIRCUMFERENCE = math.pi * (
-    (WHEEL_DIAMETER * 25.4 + 2 * (WHEEL_WIDTH * WHEEL_HEIGHT / 100)) / 1000
-)
-PULSES_PER_REV = 1  # pulses per wheel revolution
+# wheel, tank and consumption figures live in functions/config.py
 MEASURE_INTERVAL = 1000  # ms
 AVERAGE_WINDOW = 5  # speed averaging window size
-SAVE_INTERVAL = 60000  # save trip every 60 seconds
+MAX_SPEED = 300  # km/h, pulses faster than this are treated as noise
+MAX_ACCEL = 40  # km/h per second, larger speed jumps are implausible
+MAX_REJECTS = 3  # accept a jump after this many rejected samples in a row
+SAVE_INTERVAL = 600000  # routine trip save; key-off flushes immediately
+FUEL_INTERVAL = 10000  # ms
+RANGE_INTERVAL = 5000  # ms
+ENV_INTERVAL = 2000  # ms, DHT11 needs at least 1 s between reads
+INPUT_INTERVAL = 200  # ms, gear pins
+VOLTAGE_INTERVAL = 40  # ms, cranking dips; powerloss needs it on every page
+CLOCK_INTERVAL = 250  # ms, fast enough for the blinking separator
+# rates while no visible page or logger needs a value (0 = not sampled)
+FUEL_IDLE_INTERVAL = 60000  # ms
+RANGE_IDLE_INTERVAL = 0
+ENV_IDLE_INTERVAL = 30000  # ms
+INPUT_IDLE_INTERVAL = 1000  # ms
+CLOCK_IDLE_INTERVAL = 0
 TRIP_FILE = "../trip.json"
+TRIP_TMP = TRIP_FILE + ".tmp"  # written first, then renamed over it
+SNAPSHOT = "<Ih"  # RTC snapshot: trip m, fuel 0.1 L (-1 = none)
 
 # ======================================================
 # Pins
@@ -50,30 +81,42 @@ i2c = I2C(0, scl=scl_3231, sda=sda_3231)
 rtc = urtc.DS3231(i2c)
 fuel.atten(ADC.ATTN_11DB)
 voltmetr.atten(ADC.ATTN_11DB)
+voltage = VoltageMonitor(voltmetr)
 
-_pulse_count = 0
 _speed_history = []
 _trip_distance = 0.0
 _current_speed = 0.0
+_rejected_samples = 0
+_reject_streak = 0
 _last_update = time.ticks_ms()
 _last_save = _last_update
 
-# caches for fuel and range
+# caches for fuel, range and DHT readings
 _last_fuel = None
 _last_range = None
+_last_temperature = "err"
+_last_humidity = "err"
+_temperature_c = None  # numeric DHT values, None after a failed read
+_humidity_pct = None
 
 
 # ======================================================
-# Interrupts and handlers
+# Wheel pulse counting (PCNT hardware or IRQ fallback)
 # ======================================================
-def _on_pulse(pin):
-    """Increment pulse count on rising edge from wheel sensor."""
-    global _pulse_count
-    _pulse_count += 1
+def _min_pulse_us(cfg):
+    """Shortest plausible pulse interval: one pulse at MAX_SPEED."""
+    return int(cfg.m_per_pulse / (MAX_SPEED / 3.6) * 1_000_000)
+
 
+_counter = make_counter(speed_pin, _min_pulse_us(config))
 
-# Attach interrupt for speed sensor
-speed_pin.irq(trigger=Pin.IRQ_RISING, handler=_on_pulse)
+
+def _apply_config(cfg):
+    # the counter's noise filter follows a new wheel size live
+    _counter.min_interval_us = _min_pulse_us(cfg)
+
+
+config.add_listener(_apply_config)
 
 # ======================================================
 # Fuel calibration
@@ -123,6 +166,7 @@ def update_fuel(timer=None):
             if _last_fuel not in (None, "not calib")
             else "not calib"
         )
+        state.publish(FUEL, _last_fuel)
         return
 
     v = fuel.read()
@@ -136,7 +180,9 @@ def update_fuel(timer=None):
 
     ratio = (e - v) / (e - f)  # normalize between empty and full
     ratio = max(0, min(1, ratio))  # clamp to [0, 1]
-    _last_fuel = round(ratio * FULL_FUEL, 1)
+    _last_fuel = round(ratio * config.full_fuel, 1)
+    trips.note_fuel(_last_fuel)
+    state.publish(FUEL, _last_fuel)
 
 
 def update_range(timer=None):
@@ -150,14 +196,14 @@ def update_range(timer=None):
         if isinstance(_last_range, (int, float)):
             return
         _last_range = fuel_val  # propagate status string like "not calib"
+        state.publish(RANGE, _last_range)
         return
 
-    consumption = (
-        FUEL_FLOW_TRACK
-        if speed >= 100
-        else FUEL_FLOW_CITY if speed > 0 else FUEL_FLOW_TRACK
+    km_per_l = (
+        config.km_per_l_city if 0 < speed < 100 else config.km_per_l_track
     )
-    _last_range = round((fuel_val / consumption) * 100, 1)
+    _last_range = round(fuel_val * km_per_l)
+    state.publish(RANGE, _last_range)
 
 
 # ======================================================
@@ -173,28 +219,70 @@ def read_time():
     )
 
 
-def temperature():
-    """Read temperature from DHT sensor; return 'err' if failed."""
+def update_env(timer=None):
+    """Measure DHT sensor once and cache temperature and humidity."""
+    global _last_temperature, _last_humidity, _temperature_c, _humidity_pct
     try:
         dht_sensor.measure()
-        return f"{dht_sensor.temperature():.1f}C"
-    except ValueError:
-        return "err"
+        _temperature_c = dht_sensor.temperature()
+        _humidity_pct = dht_sensor.humidity()
+        _last_temperature = f"{_temperature_c:.1f}C"
+        _last_humidity = f"{_humidity_pct:.1f}"
+    except (ValueError, OSError):
+        _last_temperature = _last_humidity = "err"
+        _temperature_c = _humidity_pct = None
+    state.begin()
+    state.set(TEMPERATURE, _last_temperature)
+    state.set(HUMIDITY, _last_humidity)
+    state.end()
+
+
+def temperature():
+    """Return last DHT temperature reading; 'err' if it failed."""
+    return _last_temperature
+
+
+def get_temperature_c():
+    """Return the last DHT temperature in degrees, None if it failed."""
+    return _temperature_c
 
 
 def humidity():
-    """Read humidity from DHT sensor; return 'err' if failed."""
-    try:
-        dht_sensor.measure()
-        return f"{dht_sensor.humidity():.1f}"
-    except ValueError:
-        return "err"
+    """Return last DHT humidity reading; 'err' if it failed."""
+    return _last_humidity
+
+
+def update_voltage(timer=None):
+    """Sample the supply voltage and publish the filtered value."""
+    voltage.sample()
+    state.publish(VOLTAGE, voltage.volts())
 
 
 def get_voltage():
-    """Read voltage from ADC and scale to actual value."""
-    v = voltmetr.read() / 4095 * 15 * 1.1
-    return round(v, 1)
+    """Return last filtered supply voltage (V) without touching the ADC."""
+    return voltage.volts()
+
+
+def get_voltage_stats():
+    """Return session min/max, alarm flags and cranking dips of the supply."""
+    return {
+        "min": voltage.min_mv / 1000,
+        "max": voltage.max_mv / 1000,
+        "under": voltage.under,
+        "over": voltage.over,
+        "cranks": voltage.crank_count,
+        "crank_min": voltage.crank_min_mv / 1000,
+    }
+
+
+def update_inputs(timer=None):
+    """Sample gear pins into the shared state."""
+    state.publish(GEAR, get_transmission())
+
+
+def update_clock(timer=None):
+    """Publish the formatted RTC time into the shared state."""
+    state.publish(TIME, read_time())
 
 
 def get_transmission():
@@ -221,39 +309,52 @@ def get_transmission():
 # ======================================================
 def update_all(timer=None):
     """Compute speed, accumulate trip distance, and trigger periodic save."""
-    global _pulse_count, _trip_distance, _current_speed, _last_update
+    global _trip_distance, _current_speed, _last_update
+    global _rejected_samples, _reject_streak
 
-    # Convert pulses to distance
-    revs = _pulse_count / PULSES_PER_REV
-    _pulse_count = 0
-    dist_m = revs * WHEEL_CIRCUMFERENCE
-    _trip_distance += dist_m / 1000
+    # Convert pulses to distance (fixed point, whole mm)
+    mm = (_counter.take() * config.mm_per_pulse_q) >> MM_SHIFT
 
     # Time delta for speed calculation
     now = time.ticks_ms()
-    dt = time.ticks_diff(now, _last_update) / 1000
+    dt_ms = time.ticks_diff(now, _last_update)
     _last_update = now
 
+    # Plausibility gate: a jump no bike can make is noise on the loom;
+    # keep the previous speed and count distance at that speed instead
+    if dt_ms > 0:
+        sp_kph = round(mm * 3.6 / dt_ms, 1)  # mm/ms is m/s
+        jump = abs(sp_kph - _current_speed)
+        if jump * 1000 > MAX_ACCEL * dt_ms and _reject_streak < MAX_REJECTS:
+            _rejected_samples += 1
+            _reject_streak += 1
+            mm = int(_current_speed * dt_ms / 3.6)
+        else:
+            _reject_streak = 0
+    _trip_distance += mm / 1_000_000
+
     # Update speed and averaging buffer
-    if dt > 0:
-        sp_mps = dist_m / dt
-        sp_kph = round(sp_mps * 3.6, 1)
+    if dt_ms > 0 and not _reject_streak:
         _current_speed = sp_kph
         if sp_kph > 0:
             _speed_history.append(sp_kph)
             if len(_speed_history) > AVERAGE_WINDOW:
                 _speed_history.pop(0)
 
+    v = int(_current_speed * 10)
+    trips.update(mm, dt_ms, v)
+    histograms.update(get_transmission(), mm, dt_ms, v)
+
+    state.begin()
+    state.set(SPEED, get_speed())
+    state.set(TRIP, get_trip_km())
+    state.end()
+
     # Periodic trip save
     if time.ticks_diff(now, _last_save) > SAVE_INTERVAL:
         save_trip()
 
 
-# Configure periodic timer for main updates
-_timer = Timer(0)
-_timer.init(period=MEASURE_INTERVAL, mode=Timer.PERIODIC, callback=update_all)
-
-
 # ======================================================
 # Trip persistence
 # ======================================================
@@ -263,59 +364,94 @@ def load_trip():
     try:
         with open(TRIP_FILE) as f:
             _trip_distance = float(ujson.load(f).get("trip", 0))
-    except FileNotFoundError:
+    except (OSError, ValueError):  # missing, or cut off by a power loss
         _trip_distance = 0.0
+    state.publish(TRIP, round(_trip_distance, 1))
+
+
+def _write_trip():
+    """Replace TRIP_FILE whole, so a write cut off leaves the old one."""
+    with open(TRIP_TMP, "w") as f:
+        ujson.dump({"trip": _trip_distance}, f)
+    os.rename(TRIP_TMP, TRIP_FILE)
 
 
 def save_trip():
-    """Persist current trip distance to file and update last save timestamp."""
+    """Persist the trip, its statistics and histograms; note the time."""
     global _last_save
     try:
-        with open(TRIP_FILE, "w") as f:
-            ujson.dump({"trip": _trip_distance}, f)
+        _write_trip()
+        trips.save()
+        histograms.save()
         _last_save = time.ticks_ms()
-    except FileNotFoundError:
+    except OSError:
         pass
 
 
+def flush_trip():
+    """Fold not yet counted wheel pulses into the trip and save it."""
+    global _trip_distance
+    mm = (_counter.take() * config.mm_per_pulse_q) >> MM_SHIFT
+    _trip_distance += mm / 1_000_000
+    v = int(_current_speed * 10)
+    trips.update(mm, 0, v)  # update_all() counts the time
+    histograms.update(get_transmission(), mm, 0, v)
+    save_trip()
+
+
 def reset_trip():
     """Reset trip distance to zero and save."""
     global _trip_distance
     _trip_distance = 0.0
+    state.publish(TRIP, 0.0)
     save_trip()
 
 
 # Initialize trip from storage
 load_trip()
+trips.load()
+histograms.load()
 
 
 def pause_trip_timer():
-    """Stop periodic trip updates (timer deinit)."""
-    try:
-        _timer.deinit()
-    except ValueError:
-        pass
+    """Stop periodic trip updates."""
+    scheduler.suspend("trip")
 
 
 def resume_trip_timer():
-    """Resume periodic trip updates (timer init)."""
-    _timer.init(
-        period=MEASURE_INTERVAL, mode=Timer.PERIODIC, callback=update_all
-    )
+    """Resume periodic trip updates."""
+    scheduler.resume("trip")
 
 
 def set_trip_zero_and_save():
     """Force set trip to zero and persist immediately."""
     global _trip_distance, _last_save
     _trip_distance = 0.0
+    state.publish(TRIP, 0.0)
     try:
-        with open(TRIP_FILE, "w") as f:
-            ujson.dump({"trip": _trip_distance}, f)
+        _write_trip()
         _last_save = time.ticks_ms()
-    except FileNotFoundError:
+    except OSError:
         pass
 
 
+def _pack_snapshot(buf, offset):
+    fuel = _last_fuel
+    fuel = int(fuel * 10) if isinstance(fuel, (int, float)) else -1
+    struct.pack_into(SNAPSHOT, buf, offset, int(_trip_distance * 1000), fuel)
+
+
+def _unpack_snapshot(buf, offset):
+    """Continue the trip and fuel level of the run before a warm reset."""
+    global _trip_distance, _last_fuel
+    metres, fuel = struct.unpack_from(SNAPSHOT, buf, offset)
+    _trip_distance = metres / 1000
+    state.publish(TRIP, get_trip_km())
+    if fuel >= 0:
+        _last_fuel = fuel / 10
+        state.publish(FUEL, _last_fuel)
+
+
 # ======================================================
 # API
 # ======================================================
@@ -328,11 +464,21 @@ def get_speed():
     )
 
 
+def is_stopped():
+    """Return True while the wheel is standing still."""
+    return _current_speed == 0
+
+
 def get_trip_km():
     """Return total trip distance in kilometers."""
     return round(_trip_distance, 1)
 
 
+def set_pulse_stamp(fn):
+    """Call fn(ticks_us) for every wheel pulse; None stops it."""
+    _counter.set_stamp(fn)
+
+
 def get_fuel_level():
     """Return last computed fuel level or status string."""
     return _last_fuel
@@ -343,35 +489,79 @@ def get_remaining_range():
     return _last_range
 
 
-# ======================================================
-# Timers for background updates
-# ======================================================
-fuel_timer = Timer(5)
-fuel_timer.init(
-    period=10000, mode=Timer.PERIODIC, callback=update_fuel
-)  # every 10 sec
+def get_telemetry():
+    """Return the values of one telemetry frame (see functions/telemetry)."""
+    flags = 0
+    if voltage.under:
+        flags |= telemetry.FLAG_UNDER
+    if voltage.over:
+        flags |= telemetry.FLAG_OVER
+    if is_stopped():
+        flags |= telemetry.FLAG_STOPPED
+    return (
+        get_speed(),
+        _trip_distance,
+        get_fuel_level(),
+        get_remaining_range(),
+        voltage.mv,
+        _temperature_c,
+        _humidity_pct,
+        get_transmission(),
+        flags,
+    )
+
+
+def get_sensor_diagnostics():
+    """Return counters of wheel pulses and speed samples rejected as noise."""
+    return {
+        "rejected_pulses": _counter.rejected,
+        "rejected_samples": _rejected_samples,
+    }
 
-range_timer = Timer(2)
-range_timer.init(
-    period=5000, mode=Timer.PERIODIC, callback=update_range
-)  # every 5 sec
 
 # ======================================================
 # Initialization
 # ======================================================
 load_calib()
 
-# Prime initial values to avoid zero/None flashes before timers kick in
+# Prime initial values to avoid zero/None flashes before tasks kick in
 update_fuel()
 update_range()
-
-# Start background timers after initial priming
-fuel_timer = Timer(1)
-fuel_timer.init(
-    period=10000, mode=Timer.PERIODIC, callback=update_fuel
-)  # every 10 sec
-
-range_timer = Timer(2)
-range_timer.init(
-    period=5000, mode=Timer.PERIODIC, callback=update_range
-)  # every 5 sec
+update_env()
+update_voltage()
+update_inputs()
+update_clock()
+
+# After a warm reset continue from the RTC memory snapshot, which is
+# newer than the files on flash
+recovery.add_section(
+    "trip", struct.calcsize(SNAPSHOT), _pack_snapshot, _unpack_snapshot
+)
+recovery.add_section("trips", trips.SIZE, trips.pack_into, trips.unpack_from)
+recovery.add_section(
+    "histograms", histograms.SIZE, histograms.pack_into, histograms.unpack_from
+)
+if recovery.restore():
+    update_range()
+
+# Flush state as soon as the supply starts to collapse
+voltage.add_listener(powerloss.watch)
+powerloss.add_flush("trip", flush_trip, 100)
+
+# Register background updates; scheduler.start() runs them staggered.
+# Pages and loggers declare what they need with scheduler.want().
+scheduler.add_task("trip", update_all, MEASURE_INTERVAL)
+scheduler.add_task(
+    "fuel", update_fuel, FUEL_INTERVAL, idle_ms=FUEL_IDLE_INTERVAL
+)
+scheduler.add_task(
+    "range", update_range, RANGE_INTERVAL, idle_ms=RANGE_IDLE_INTERVAL
+)
+scheduler.add_task("env", update_env, ENV_INTERVAL, idle_ms=ENV_IDLE_INTERVAL)
+scheduler.add_task(
+    "inputs", update_inputs, INPUT_INTERVAL, idle_ms=INPUT_IDLE_INTERVAL
+)
+scheduler.add_task("voltage", update_voltage, VOLTAGE_INTERVAL)
+scheduler.add_task(
+    "clock", update_clock, CLOCK_INTERVAL, idle_ms=CLOCK_IDLE_INTERVAL
+)
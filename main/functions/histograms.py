@@ -0,0 +1,97 @@
+import struct
+from array import array
+
+# ======================================================
+# Settings
+# ======================================================
+HIST_FILE = "../histograms.bin"
+VERSION = 1
+GEARS = ("N", 1, 2, 3, 4, 5, 6)  # values of get_transmission()
+BAND_KPH = 10  # width of one speed band
+BANDS = 16  # the last band holds everything above (BANDS - 1) * BAND_KPH
+
+HEADER = "<BBB"  # version, gear count, band count
+HEADER_SIZE = struct.calcsize(HEADER)
+
+# whole seconds and metres; the ms and mm remainders carry into them
+gear_s = array("I", [0] * len(GEARS))
+gear_m = array("I", [0] * len(GEARS))
+band_s = array("I", [0] * BANDS)
+_gear_ms = array("I", [0] * len(GEARS))
+_gear_mm = array("I", [0] * len(GEARS))
+_band_ms = array("I", [0] * BANDS)
+
+_ARRAYS = (gear_s, gear_m, band_s, _gear_ms, _gear_mm, _band_ms)
+_SHAPE = (VERSION, len(GEARS), BANDS)
+SIZE = 8 * (2 * len(GEARS) + BANDS)  # bytes of all arrays
+_header = bytearray(HEADER_SIZE)
+
+
+def _add(whole, part, i, amount):
+    part[i] += amount
+    if part[i] >= 1000:
+        whole[i] += part[i] // 1000
+        part[i] %= 1000
+
+
+def update(gear, mm, dt_ms, v):
+    """Count dt_ms and mm in gear and dt_ms in the band of v (0.1 km/h).
+
+    Speed bands only count while moving; standing still is in the trips.
+    """
+    g = GEARS.index(gear) if gear in GEARS else 0
+    _add(gear_s, _gear_ms, g, dt_ms)
+    _add(gear_m, _gear_mm, g, mm)
+    if v:
+        _add(band_s, _band_ms, min(v // (BAND_KPH * 10), BANDS - 1), dt_ms)
+
+
+def band_label(i):
+    """Lower edge of band i in km/h, with + on the open last band."""
+    low = i * BAND_KPH
+    return f"{low}+" if i == BANDS - 1 else str(low)
+
+
+def reset():
+    for a in _ARRAYS:
+        for i in range(len(a)):
+            a[i] = 0
+
+
+def pack_into(buf, offset):
+    """Write all counters (SIZE bytes) into buf."""
+    for a in _ARRAYS:
+        fmt = "<%dI" % len(a)
+        struct.pack_into(fmt, buf, offset, *a)
+        offset += 4 * len(a)
+
+
+def unpack_from(buf, offset):
+    """Restore the counters from pack_into() data."""
+    for a in _ARRAYS:
+        fmt = "<%dI" % len(a)
+        for i, v in enumerate(struct.unpack_from(fmt, buf, offset)):
+            a[i] = v
+        offset += 4 * len(a)
+
+
+def load():
+    """Restore the counters; a file of another shape leaves them at zero."""
+    try:
+        with open(HIST_FILE, "rb") as f:
+            f.readinto(_header)
+            if struct.unpack(HEADER, _header) != _SHAPE:
+                return
+            if sum(f.readinto(a) or 0 for a in _ARRAYS) != SIZE:
+                reset()  # truncated
+    except OSError:
+        pass
+
+
+def save():
+    """Write all counters to HIST_FILE (little-endian arrays)."""
+    struct.pack_into(HEADER, _header, 0, *_SHAPE)
+    with open(HIST_FILE, "wb") as f:
+        f.write(_header)
+        for a in _ARRAYS:
+            f.write(a)
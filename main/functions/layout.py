@@ -0,0 +1,105 @@
+import s3lcd
+from functions import palette
+from functions.markup import draw_text, tft
+
+# Alignment along one axis (left/top, centre, right/bottom)
+_START = 0
+_MIDDLE = 1
+_END = 2
+
+# anchor -> (horizontal, vertical), same names as Markup methods
+_ANCHORS = {
+    "top_left": (_START, _START),
+    "top_center": (_MIDDLE, _START),
+    "top_right": (_END, _START),
+    "left_center": (_START, _MIDDLE),
+    "center": (_MIDDLE, _MIDDLE),
+    "right_center": (_END, _MIDDLE),
+    "bottom_left": (_START, _END),
+    "bottom_center": (_MIDDLE, _END),
+    "bottom_right": (_END, _END),
+}
+
+
+class Slot:
+    """Declaration of one named text field on a page."""
+
+    def __init__(
+        self,
+        name,
+        anchor,
+        font,
+        max_chars,
+        fc=s3lcd.WHITE,
+        bc=s3lcd.BLACK,
+        ox=0,
+        oy=0,
+    ):
+        if anchor not in _ANCHORS:
+            raise ValueError("unknown anchor: " + anchor)
+        self.name = name
+        self.anchor = anchor
+        self.font = font
+        self.max_chars = max_chars
+        self.fc = fc
+        self.bc = bc
+        self.ox = ox
+        self.oy = oy
+
+
+class Layout:
+    """A page of slots whose rectangles are resolved once per rotation.
+
+    resolve() turns every slot into a tuple of
+    (x, y, width, height, font, max_chars, align, fc, bc) so that draw()
+    is a dictionary lookup, one fill_rect and one text blit.
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._table = {}
+        self.resolve()
+
+    def resolve(self):
+        """Recompute slots; call after tft.rotation() or a palette change."""
+        sw, sh = tft.width(), tft.height()
+        table = {}
+        for s in self.slots:
+            halign, valign = _ANCHORS[s.anchor]
+            w = s.max_chars * s.font.WIDTH
+            h = s.font.HEIGHT
+            if halign == _START:
+                x = s.ox
+            elif halign == _MIDDLE:
+                x = sw // 2 - w // 2 + s.ox
+            else:
+                x = sw - w + s.ox
+            if valign == _START:
+                y = s.oy
+            elif valign == _MIDDLE:
+                y = sh // 2 - h // 2 + s.oy
+            else:
+                y = sh - h + s.oy
+            fc, bc = palette.color(s.fc), palette.color(s.bc)
+            table[s.name] = (x, y, w, h, s.font, s.max_chars, halign, fc, bc)
+        self._table = table
+
+    def rect(self, name):
+        """Return (x, y, width, height) of a slot."""
+        return self._table[name][:4]
+
+    def chars(self, name):
+        """Return how many characters fit in a slot."""
+        return self._table[name][5]
+
+    def draw(self, name, text):
+        """Clear a slot and draw text aligned inside it."""
+        x, y, w, h, font, max_chars, align, fc, bc = self._table[name]
+        text = text[:max_chars]
+        pad = w - len(text) * font.WIDTH
+        tft.fill_rect(x, y, w, h, bc)
+        if align == _MIDDLE:
+            x += pad // 2
+        elif align == _END:
+            x += pad
+        draw_text(font, text, x, y, fc, bc)
@@ -1,12 +1,21 @@
 import s3lcd
+from functions.binfont import BinFont
 from tft_drivers import tft_config
 
 tft = tft_config.config(tft_config.WIDE)
 
 
+def draw_text(font, text, x, y, fc, bc):
+    """Draw text with either an s3lcd font module or a BinFont."""
+    if isinstance(font, BinFont):
+        font.text(tft, text, x, y, fc, bc)
+    else:
+        tft.text(font, text, x, y, fc, bc)
+
+
 class Markup:
     def _draw(self, font, text, fc, bc, x, y):
-        tft.text(font, text, x, y, fc, bc)
+        draw_text(font, text, x, y, fc, bc)
 
     def _lenpx(self, font, text):
         return len(text) * font.WIDTH
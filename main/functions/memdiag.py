@@ -0,0 +1,234 @@
+import builtins
+import gc
+import sys
+import time
+from array import array
+
+import ujson
+from functions import powerloss, scheduler
+
+# ======================================================
+# Settings
+# ======================================================
+COLLECT = True  # gc.collect() around traced imports: exact, slower boot
+MAX_BOOT = 64  # boot records kept
+SAMPLE_INTERVAL = 1000  # ms, free/allocated and the watermarks
+PROBE_INTERVAL = 5000  # ms, largest free block while the page is shown
+PROBE_IDLE_INTERVAL = 0  # the probe allocates, so only on demand
+PROBE_STEP = 1024  # resolution of the largest block search (bytes)
+PROBE_MAX = 256 * 1024  # bytes; a block this big counts as unfragmented
+WINDOW_MS = 60000  # one minimum-free watermark per window
+RING = 8  # watermarks kept
+REPORT_FILE = "../memory.json"
+
+# (name, depth, bytes kept, free after); imports nest by depth
+boot = []
+free = 0
+alloc = 0
+largest = 0
+frag = 0  # % of the free heap outside the largest block
+low = 0  # lowest free seen since boot (0 = not sampled yet)
+lows = array("I", [0] * RING)  # per-window minimum free, oldest first
+_head = 0
+_window_low = 0
+_window_start = 0
+_real_import = None
+_depth = 0
+_last_alloc = 0
+
+
+def _measure():
+    if COLLECT:
+        gc.collect()
+    return gc.mem_free(), gc.mem_alloc()
+
+
+# --------------------------
+# Boot
+# --------------------------
+def _import(name, *args):
+    """builtins.__import__ that records what each new module keeps."""
+    global _depth, _last_alloc
+    fromlist = args[2] if len(args) > 2 and args[2] else ()
+    mod = sys.modules.get(name)
+    missing = [f for f in fromlist if mod and not hasattr(mod, f)]
+    if (mod is not None and not missing) or len(boot) >= MAX_BOOT:
+        return _real_import(name, *args)  # nothing new to load
+    label = name + "." + ",".join(missing) if missing else name
+    i = len(boot)
+    boot.append(None)  # keep parents ahead of what they import
+    before = len(sys.modules)
+    _, alloc0 = _measure()
+    _depth += 1
+    try:
+        module = _real_import(name, *args)
+    except BaseException:
+        del boot[i:]  # a failed import records nothing
+        raise
+    finally:
+        _depth -= 1
+    if len(sys.modules) == before:
+        del boot[i:]
+    else:
+        free1, alloc1 = _measure()
+        boot[i] = (label, _depth, alloc1 - alloc0, free1)
+        if not _depth:
+            _last_alloc = alloc1
+    return module
+
+
+def trace_imports():
+    """Record the heap cost of every module imported from now on.
+
+    Call it as early as possible (boot.py); stop_tracing() ends it.
+    """
+    global _real_import, _last_alloc
+    if _real_import is None:
+        _real_import = builtins.__import__
+        builtins.__import__ = _import
+        _, _last_alloc = _measure()
+
+
+def stop_tracing():
+    global _real_import
+    if _real_import is not None:
+        builtins.__import__ = _real_import
+        _real_import = None
+
+
+def mark(name):
+    """Record what was allocated outside imports since the last record."""
+    global _last_alloc
+    if len(boot) < MAX_BOOT:
+        free1, alloc1 = _measure()
+        boot.append((name, 0, alloc1 - _last_alloc, free1))
+        _last_alloc = alloc1
+
+
+# --------------------------
+# Runtime
+# --------------------------
+def sample():
+    """Scheduler task: read the heap and update the watermarks."""
+    global free, alloc, low, _head, _window_low, _window_start
+    free = gc.mem_free()
+    alloc = gc.mem_alloc()
+    if not low or free < low:
+        low = free
+    now = time.ticks_ms()
+    if not _window_low or free < _window_low:
+        _window_low = free
+    if time.ticks_diff(now, _window_start) >= WINDOW_MS:
+        lows[_head] = _window_low
+        _head = (_head + 1) % RING
+        _window_low = 0
+        _window_start = now
+
+
+def largest_free(limit):
+    """Size of the biggest bytearray the heap can still hold, up to limit.
+
+    The probes that fit stay behind as garbage; collect afterwards.
+    """
+    lo, hi = 0, limit // PROBE_STEP
+    while lo < hi:
+        mid = (lo + hi + 1) >> 1
+        try:
+            bytearray(mid * PROBE_STEP)
+            lo = mid
+        except MemoryError:
+            hi = mid - 1
+    return lo * PROBE_STEP
+
+
+def probe():
+    """Scheduler task: find the largest free block and fragmentation.
+
+    The search stops at PROBE_MAX so the task never claims the whole
+    heap; frag is 0 when a block that big is still free.
+    """
+    global largest, frag
+    gc.collect()
+    sample()
+    limit = min(free, PROBE_MAX)
+    largest = largest_free(limit)
+    gc.collect()  # drop the probes before the next sample()
+    if largest >= limit or not free:
+        frag = 0
+    else:
+        frag = (free - largest) * 100 // free
+
+
+def watermarks():
+    """Per-window minimum free bytes, oldest first."""
+    ordered = (lows[(_head + i) % RING] for i in range(RING))
+    return [w for w in ordered if w]
+
+
+# --------------------------
+# Reports
+# --------------------------
+def report():
+    """Return the boot records and the current figures as text lines."""
+    lines = ["  kept B    free B  step"]
+    for name, depth, kept, free_after in boot:
+        lines.append(f"{kept:8d} {free_after:9d}  {'  ' * depth}{name}")
+    lines.append(
+        f"free {free} alloc {alloc} largest {largest} frag {frag}% low {low}"
+    )
+    lines.append("watermarks " + " ".join(str(w) for w in watermarks()))
+    return lines
+
+
+def print_report():
+    """Print the report on the serial console, e.g. from the REPL."""
+    for line in report():
+        print(line)
+
+
+def save():
+    try:
+        with open(REPORT_FILE, "w") as f:
+            ujson.dump(
+                {
+                    "boot": boot,
+                    "free": free,
+                    "alloc": alloc,
+                    "largest": largest,
+                    "frag": frag,
+                    "low": low,
+                    "lows": watermarks(),
+                },
+                f,
+            )
+    except OSError:
+        pass
+
+
+def load():
+    """Read REPORT_FILE back, e.g. a copy fetched from the board."""
+    global free, alloc, largest, frag, low, _head
+    with open(REPORT_FILE) as f:
+        data = ujson.load(f)
+    boot[:] = [tuple(r) for r in data["boot"]]
+    free, alloc = data["free"], data["alloc"]
+    largest, frag, low = data["largest"], data["frag"], data["low"]
+    ws = data["lows"][-RING:]
+    for i in range(RING):
+        lows[i] = ws[i] if i < len(ws) else 0
+    _head = len(ws) % RING
+
+
+def end_boot():
+    """Stop tracing, report the boot on serial and start sampling."""
+    global _window_start
+    stop_tracing()
+    _window_start = time.ticks_ms()
+    probe()
+    print_report()
+    save()
+    scheduler.add_task("memory", sample, SAMPLE_INTERVAL)
+    scheduler.add_task(
+        "heap_probe", probe, PROBE_INTERVAL, idle_ms=PROBE_IDLE_INTERVAL
+    )
+    powerloss.add_flush("memory", save)
@@ -1,7 +1,9 @@
 import time
 
 import s3lcd
-from fonts import vga2_bold_16x32 as big
+from functions import trips
+from functions.binfont import BIG_FONT, load_font
+from functions.config import FIELDS, config
 from functions.handlers import (
     calibrate_empty,
     calibrate_full,
@@ -16,12 +18,14 @@ from tft_drivers.tft_buttons import Buttons
 btn_select = Buttons().left
 btn_next = Buttons().right
 
+big = load_font(BIG_FONT)
 markup = Markup()
 
 MENU_ITEMS = [
     "Time",
     "FUEL calibration",
     "Reset Trip",
+    "Settings",
 ]
 
 
@@ -34,7 +38,7 @@ def draw_menu(index):
     markup.top_left(big, "Menu", s3lcd.WHITE)
     for i, item in enumerate(MENU_ITEMS):
         color = s3lcd.YELLOW if i == index else s3lcd.WHITE
-        tft.text(big, item, 10, 50 + i * 40, color)
+        markup.top_left(big, item, color, s3lcd.BLACK, 10, 40 + i * 32)
     tft.show()
 
 
@@ -56,6 +60,7 @@ _MENU_ACTIONS = {
     "Time": lambda: menu_set_time(),
     "FUEL calibration": lambda: menu_fuel_calibration(),
     "Reset Trip": lambda: menu_reset_trip(),
+    "Settings": lambda: menu_settings(),
 }
 
 
@@ -218,14 +223,34 @@ def menu_fuel_calibration():
             time.sleep_ms(250)
 
 
+def _reset_trip_a():
+    set_trip_zero_and_save()
+    trips.A.reset()
+    trips.save()
+
+
+def _reset_trip(trip):
+    trip.reset()
+    trips.save()
+
+
+# NEXT cycles through these; SELECT resets the one shown
+_RESET_CHOICES = (
+    ("Cancel?", None),
+    ("Trip A?", _reset_trip_a),
+    ("Trip B?", lambda: _reset_trip(trips.B)),
+    ("Tank?", lambda: _reset_trip(trips.TANK)),
+)
+
+
 def menu_reset_trip():
-    """reset trip"""
+    """reset trip A (the dashboard trip), trip B or the tank trip"""
     tft.fill(s3lcd.BLACK)
     markup.center(big, "Reset Trip?", s3lcd.WHITE)
     tft.show()
     time.sleep(1)
 
-    confirm = False
+    choice = 0
     last_action = time.ticks_ms()
 
     while True:
@@ -233,17 +258,14 @@ def menu_reset_trip():
         if time.ticks_diff(time.ticks_ms(), last_action) > 8000:
             return
 
+        label, reset = _RESET_CHOICES[choice]
         tft.fill(s3lcd.BLACK)
-        markup.center(
-            big,
-            "Confirm?" if confirm else "Cancel?",
-            s3lcd.YELLOW if confirm else s3lcd.CYAN,
-        )
+        markup.center(big, label, s3lcd.YELLOW if reset else s3lcd.CYAN)
         markup.bottom_left(big, "NEXT -> switch", s3lcd.WHITE)
         tft.show()
 
         if not btn_next.value():
-            confirm = not confirm
+            choice = (choice + 1) % len(_RESET_CHOICES)
             last_action = time.ticks_ms()
             time.sleep_ms(250)
             while not btn_next.value():
@@ -255,10 +277,10 @@ def menu_reset_trip():
             while not btn_select.value():
                 time.sleep_ms(50)
 
-            if confirm:
+            if reset:
                 # Safe reset: stop timer -> write -> start timer
                 pause_trip_timer()
-                set_trip_zero_and_save()
+                reset()
                 resume_trip_timer()
 
                 tft.fill(s3lcd.BLACK)
@@ -271,3 +293,46 @@ def menu_reset_trip():
                 tft.show()
                 time.sleep_ms(800)
             return
+
+
+def menu_settings():
+    """edit config fields; NEXT picks a field, SEL steps its value"""
+    tft.fill(s3lcd.BLACK)
+    markup.center(big, "Settings", s3lcd.WHITE)
+    tft.show()
+    time.sleep(1)
+
+    field = 0
+    changed = False
+    last_action = time.ticks_ms()
+
+    while True:
+        tft.fill(s3lcd.BLACK)
+        markup.top_left(big, FIELDS[field][7], s3lcd.WHITE)
+        markup.center(big, f"[{config.text(field)}]", s3lcd.YELLOW)
+        markup.bottom_left(big, "NEXT -> switch", s3lcd.WHITE)
+        tft.show()
+
+        # timeout inactive -> apply live, save and exit
+        if time.ticks_diff(time.ticks_ms(), last_action) > 8000:
+            if changed:
+                config.apply()
+                tft.fill(s3lcd.BLACK)
+                if config.save():
+                    markup.center(big, "SAVE", s3lcd.GREEN)
+                else:  # applied until the next reboot
+                    markup.center(big, "SAVE FAILED", s3lcd.RED)
+                tft.show()
+                time.sleep(1)
+            return
+
+        if not btn_next.value():
+            field = (field + 1) % len(FIELDS)
+            last_action = time.ticks_ms()
+            time.sleep_ms(250)
+
+        if not btn_select.value():
+            config.step(field)
+            changed = True
+            last_action = time.ticks_ms()
+            time.sleep_ms(250)
@@ -0,0 +1,227 @@
+import time
+
+import s3lcd
+from functions import palette, scheduler
+from functions.layout import Layout, Slot
+from functions.markup import tft
+
+# ======================================================
+# Settings
+# ======================================================
+TAP_MAX_MS = 600  # longer presses are holds (both held opens the menu)
+POLL_MS = 500  # default refresh of values read from getters, not the state
+ROW_HEIGHT = 34  # table pages: title row, then one row per value
+VALUE_CHARS = 10
+# statuses shown instead of a reading, without its unit, and their
+# short forms for slots too narrow for them
+STATUS_SHORT = {"not calib": "cal?", "err": "err"}
+
+_CANCELLED = -1  # press that turned into a two-button hold
+
+
+class Page:
+    """One screen: its layout, what it shows and the sampling it needs.
+
+    items are (source, target, fmt). source is a state field or a
+    function polled every POLL_MS while the page is visible; target is
+    a layout slot or an object with draw(value) and invalidate(), such
+    as a SegmentNumber. labels are (slot, text) drawn when the page is
+    shown. needs names the scheduler tasks that must run at full rate.
+    enter() and leave() run when the pager moves to and away from it.
+    """
+
+    def __init__(
+        self,
+        name,
+        layout,
+        items,
+        needs=(),
+        labels=(),
+        background=None,
+        poll_ms=POLL_MS,
+        enter=None,
+        leave=None,
+    ):
+        self.name = name
+        self.layout = layout
+        self.items = items
+        self.needs = needs
+        self.labels = labels
+        self.background = background
+        self.poll_ms = poll_ms
+        self.enter = enter
+        self.leave = leave
+        self._texts = {}
+        self._polled_at = None
+        self._covered = ()  # items under an overlay, not drawn
+        self._band = None
+        self._dirty = set()  # items to draw even if unchanged
+
+    def _rect(self, target):
+        if isinstance(target, str):
+            return self.layout.rect(target)
+        return target.x, target.y, target.width, target.height
+
+    def show(self, assets, snapshot):
+        """Clear the screen for this page and redraw everything."""
+        if self.background:
+            assets.blit(palette.picture(self.background))
+        else:
+            tft.fill(palette.color(s3lcd.BLACK))
+        for slot, text in self.labels:
+            self.layout.draw(slot, text)
+        for _, target, _ in self.items:
+            if not isinstance(target, str):
+                target.invalidate()
+        self._texts = {}
+        self._polled_at = None
+        self._covered = ()
+        self._band = None
+        self._dirty = set()
+        snapshot.invalidate()
+        scheduler.want("page", self.needs)
+        if self.enter:
+            self.enter()
+
+    def cover(self, y, h):
+        """Leave rows y..y+h to an overlay until uncover()."""
+        self._band = (y, h)
+        self._covered = [
+            i
+            for i, (_, target, _) in enumerate(self.items)
+            if _overlaps(self._rect(target), y, h)
+        ]
+
+    def uncover(self, assets):
+        """Repaint the covered band and the items and labels in it."""
+        if self._band is None:
+            return
+        y, h = self._band
+        if self.background:
+            assets.blit_rows(palette.picture(self.background), y, h)
+        else:
+            tft.fill_rect(0, y, tft.width(), h, palette.color(s3lcd.BLACK))
+        for slot, text in self.labels:
+            if _overlaps(self.layout.rect(slot), y, h):
+                self.layout.draw(slot, text)
+        for i in self._covered:
+            target = self.items[i][1]
+            if isinstance(target, str):
+                self._texts.pop(i, None)
+            else:
+                target.invalidate()
+            self._dirty.add(i)
+        self._covered = ()
+        self._band = None
+
+    def hide(self):
+        if self.leave:
+            self.leave()
+
+    def draw(self, snapshot, values):
+        """Draw items whose value changed; return True if any was."""
+        now = time.ticks_ms()
+        poll = (
+            self._polled_at is None
+            or time.ticks_diff(now, self._polled_at) >= self.poll_ms
+        )
+        if poll:
+            self._polled_at = now
+        drawn = False
+        covered, dirty = self._covered, self._dirty
+        for i, (source, target, fmt) in enumerate(self.items):
+            if i in covered:
+                continue
+            if isinstance(source, int):
+                if i not in dirty and not snapshot.changed(source):
+                    continue
+                value = values[source]
+            elif poll or i in dirty:
+                value = source()
+            else:
+                continue
+            if not isinstance(target, str):
+                target.draw(value)
+                drawn = True
+                continue
+            if isinstance(value, str) and value in STATUS_SHORT:
+                text = value
+                if len(text) > self.layout.chars(target):
+                    text = STATUS_SHORT[value]
+            else:
+                text = fmt.format(value)
+            if self._texts.get(i) != text:
+                self._texts[i] = text
+                self.layout.draw(target, text)
+                drawn = True
+        if dirty:
+            dirty.clear()
+        return drawn
+
+
+def _overlaps(rect, y, h):
+    return rect[1] < y + h and rect[1] + rect[3] > y
+
+
+def table_page(name, title, font, rows, needs=()):
+    """Build a page of labelled values: rows are (label, source, fmt)."""
+    slots = [Slot("title", "top_center", font, len(title))]
+    labels = [("title", title)]
+    items = []
+    label_chars = tft.width() // font.WIDTH - VALUE_CHARS
+    for i, (label, source, fmt) in enumerate(rows):
+        y = (i + 1) * ROW_HEIGHT
+        slots.append(Slot(f"l{i}", "top_left", font, label_chars, oy=y))
+        slots.append(
+            Slot(f"v{i}", "top_right", font, VALUE_CHARS, s3lcd.YELLOW, oy=y)
+        )
+        labels.append((f"l{i}", label))
+        items.append((source, f"v{i}", fmt))
+    return Page(name, Layout(slots), items, needs, labels)
+
+
+class Pager:
+    """The list of pages and the button taps that move between them."""
+
+    def __init__(self, pages, assets):
+        self.pages = pages
+        self.assets = assets
+        self.index = 0
+        self._down = [None, None]  # press start per button
+
+    @property
+    def page(self):
+        return self.pages[self.index]
+
+    def resolve(self):
+        """Recompute every page layout (rotation or palette change)."""
+        for p in self.pages:
+            p.layout.resolve()
+
+    def show(self, snapshot):
+        self.page.show(self.assets, snapshot)
+
+    def _tapped(self, i, pin, other):
+        start = self._down[i]
+        if not pin.value():  # buttons are active low
+            if start is None:
+                self._down[i] = time.ticks_ms()
+            if not other.value():
+                self._down[i] = _CANCELLED
+            return False
+        self._down[i] = None
+        if start is None or start == _CANCELLED:
+            return False
+        return time.ticks_diff(time.ticks_ms(), start) < TAP_MAX_MS
+
+    def poll(self, btn_prev, btn_next):
+        """Handle taps; return True when the page changed."""
+        step = 0
+        if self._tapped(0, btn_prev, btn_next):
+            step = -1
+        if self._tapped(1, btn_next, btn_prev):
+            step = 1
+        if step:
+            self.page.hide()
+            self.index = (self.index + step) % len(self.pages)
+        return bool(step)
@@ -0,0 +1,37 @@
+# ======================================================
+# Settings
+# ======================================================
+NIGHT_LEVEL = 35  # % of day brightness, same as asset_compiler --dark
+DARK_SUFFIX = "_dk"  # night copies of pictures in the asset pack
+
+night = False
+_night_colors = {}  # day RGB565 -> night RGB565, filled once per colour
+
+
+def dim(color, level=NIGHT_LEVEL):
+    """Scale the channels of an RGB565 colour to level percent."""
+    r = (color >> 11) * level // 100
+    g = ((color >> 5) & 0x3F) * level // 100
+    b = (color & 0x1F) * level // 100
+    return (r << 11) | (g << 5) | b
+
+
+def set_night(on):
+    """Select the day or the night palette."""
+    global night
+    night = bool(on)
+
+
+def color(c):
+    """Return colour c in the current palette."""
+    if not night:
+        return c
+    dark = _night_colors.get(c)
+    if dark is None:
+        dark = _night_colors[c] = dim(c)
+    return dark
+
+
+def picture(name):
+    """Return the asset name of a picture in the current palette."""
+    return name + DARK_SUFFIX if night else name
@@ -0,0 +1,192 @@
+import math
+import time
+from array import array
+
+import ujson
+
+# ======================================================
+# Settings
+# ======================================================
+MAX_PULSES = 1024  # pulse times kept per run (4 KB)
+RECORD_M = 500  # m of run that must fit; finer wheels store fewer stamps
+ARM_MS = 2000  # no pulse for this long means standing still: arm
+TIMEOUT_MS = 60000  # end a run that never reaches every target
+BEST_FILE = "../perf.json"
+
+# (name, from km/h, to km/h) and (name, metres)
+SPEED_RUNS = (("0-50", 0, 50), ("0-100", 0, 100), ("60-100", 60, 100))
+DISTANCE_RUNS = (("100m", 100), ("400m", 400))
+NAMES = tuple(r[0] for r in SPEED_RUNS + DISTANCE_RUNS)
+
+# states
+OFF = 0  # not enabled
+WAIT = 1  # moving, waiting for a standstill
+ARMED = 2  # standing still, the next pulse starts a run
+RUNNING = 3
+DONE = 4  # results shown; arms again at the next standstill
+STATUS = ("Off", "Stop", "Ready", "Go!", "Done")
+
+
+class PerfTimer:
+    """Acceleration and distance timer driven by wheel pulse times.
+
+    While enabled, the hard wheel interrupt hands every pulse time to
+    stamp(), which only stores it; with many pulses per revolution only
+    every stride-th one, so RECORD_M of travel fit into MAX_PULSES.
+    poll(), called from the render loop, derives the speed of each
+    stored interval at its midpoint and interpolates the moments the
+    targets were crossed, so results are resolved to the pulse timing
+    (microseconds) rather than the 1 s speed update. A run starts at
+    the first pulse after a standstill; that first wheel movement works
+    like the rollout of a drag strip.
+    """
+
+    def __init__(self, metres_per_pulse, set_stamp):
+        self.metres_per_pulse = metres_per_pulse
+        self._set_stamp = set_stamp
+        self.state = OFF
+        self.results = [None] * len(NAMES)  # ms
+        self.best = [None] * len(NAMES)
+        self._times = array("I", [0] * MAX_PULSES)
+        self._n = 0
+        self._stride = 1  # pulses per stored time
+        self._skip = 0
+        self._recording = False
+        self._last_us = 0
+        self._done = 0  # pulses already analysed
+        self._prev = (0.0, 0.0)  # (time us, km/h) of the last interval
+        self._crossed = {}  # km/h -> time us since the start
+        self._load_best()
+
+    # --------------------------
+    # Interrupt side
+    # --------------------------
+    def stamp(self, us):
+        """Store one pulse time; safe in a hard interrupt."""
+        self._last_us = us
+        if self._recording and self._n < MAX_PULSES:
+            if self._skip:
+                self._skip -= 1
+                return
+            self._skip = self._stride - 1
+            self._times[self._n] = us
+            self._n += 1
+
+    # --------------------------
+    # Render loop side
+    # --------------------------
+    def enable(self):
+        if self.state == OFF:
+            self._last_us = time.ticks_us()
+            self.state = WAIT
+            self._set_stamp(self.stamp)
+
+    def disable(self):
+        self._set_stamp(None)
+        self._recording = False
+        self.state = OFF
+
+    def elapsed_ms(self):
+        """Time since the start of the current or last run."""
+        if self.state == RUNNING:
+            return time.ticks_diff(time.ticks_us(), self._times[0]) // 1000
+        return max([r for r in self.results if r is not None] or [0])
+
+    def poll(self):
+        """Advance the state machine; return the status text."""
+        state = self.state
+        now = time.ticks_us()
+        still = time.ticks_diff(now, self._last_us) > ARM_MS * 1000
+        if state in (WAIT, DONE) and still:
+            pulses = RECORD_M / self.metres_per_pulse
+            self._stride = max(1, math.ceil(pulses / MAX_PULSES))
+            self._n = 0
+            self._skip = 0
+            self._recording = True
+            self.state = ARMED
+        elif state == ARMED and self._n:
+            self._start()
+        elif state == RUNNING:
+            self._analyse()
+            timed_out = (
+                time.ticks_diff(now, self._times[0]) > TIMEOUT_MS * 1000
+            )
+            if (
+                still
+                or timed_out
+                or self._n == MAX_PULSES
+                or None not in self.results
+            ):
+                self._finish()
+        return STATUS[self.state]
+
+    def _start(self):
+        self.results = [None] * len(NAMES)
+        self._done = 1
+        self._prev = (0.0, 0.0)  # launch from rest at the first pulse
+        self._crossed = {}
+        self.state = RUNNING
+
+    def _analyse(self):
+        """Look at pulses that arrived since the last call."""
+        times = self._times
+        t0 = times[0]
+        mpp = self.metres_per_pulse * self._stride  # between stored times
+        n = self._n
+        for i in range(self._done, n):
+            a = time.ticks_diff(times[i - 1], t0)
+            b = time.ticks_diff(times[i], t0)
+            if b <= a:
+                continue
+            mid, kph = (a + b) / 2, mpp / (b - a) * 3_600_000
+            pt, pv = self._prev
+            for _, low, high in SPEED_RUNS:
+                for v in (low, high):
+                    if v and v not in self._crossed and pv < v <= kph:
+                        self._crossed[v] = pt + (v - pv) / (kph - pv) * (
+                            mid - pt
+                        )
+            self._prev = (mid, kph)
+        self._done = n
+
+        for i, (_, low, high) in enumerate(SPEED_RUNS):
+            if self.results[i] is None and high in self._crossed:
+                start = self._crossed.get(low, 0) if low else 0
+                self.results[i] = int(self._crossed[high] - start) // 1000
+        for j, (_, metres) in enumerate(DISTANCE_RUNS):
+            i = len(SPEED_RUNS) + j
+            k = metres / mpp  # stored times after the first one
+            whole = int(k)
+            if self.results[i] is None and whole + 1 < n:
+                a = time.ticks_diff(times[whole], t0)
+                b = time.ticks_diff(times[whole + 1], t0)
+                self.results[i] = int(a + (k - whole) * (b - a)) // 1000
+
+    def _finish(self):
+        self._recording = False
+        self.state = DONE
+        improved = False
+        for i, r in enumerate(self.results):
+            if r is not None and (self.best[i] is None or r < self.best[i]):
+                self.best[i] = r
+                improved = True
+        if improved:
+            self._save_best()
+
+    # --------------------------
+    # Best runs
+    # --------------------------
+    def _load_best(self):
+        try:
+            with open(BEST_FILE) as f:
+                best = ujson.load(f)
+        except (OSError, ValueError):
+            return
+        self.best = [best.get(name) for name in NAMES]
+
+    def _save_best(self):
+        try:
+            with open(BEST_FILE, "w") as f:
+                ujson.dump(dict(zip(NAMES, self.best)), f)
+        except OSError:
+            pass
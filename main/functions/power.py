@@ -0,0 +1,101 @@
+import time
+
+import esp32
+import machine
+from functions import acquisition, powerloss, recovery, scheduler
+from functions.brightness_control import set_brightness
+from tft_drivers import tft_config
+
+# ======================================================
+# Settings
+# ======================================================
+IDLE_TIMEOUT = 300000  # ms stopped with the engine off before sleeping
+ENGINE_OFF_MV = 13000  # below this the alternator is not charging
+CHECK_INTERVAL = 1000  # ms
+DEEP_SLEEP = False  # deep sleep reboots on wake; light sleep resumes
+SPEED_WAKE_LEVEL = esp32.WAKEUP_ANY_HIGH  # wheel sensor edge
+ALARM_PIN = None  # DS3231 INT/SQW (open drain, active low), if wired
+
+_is_stopped = None
+_monitor = None
+_idle_since = None
+_sleep_requested = False
+
+
+def setup(is_stopped, monitor):
+    """Start idle detection.
+
+    is_stopped() reports whether the wheel is standing still and monitor
+    is the VoltageMonitor of the supply.
+    """
+    global _is_stopped, _monitor
+    _is_stopped = is_stopped
+    _monitor = monitor
+    scheduler.add_task("power", _check, CHECK_INTERVAL)
+
+
+def _check():
+    """Scheduler task: request sleep after IDLE_TIMEOUT of key-off idle."""
+    global _idle_since, _sleep_requested
+    if not _is_stopped() or _monitor.mv >= ENGINE_OFF_MV:
+        _idle_since = None
+        return
+    now = time.ticks_ms()
+    if _idle_since is None:
+        _idle_since = now
+    elif time.ticks_diff(now, _idle_since) > IDLE_TIMEOUT:
+        _sleep_requested = True
+
+
+def pending():
+    """Return True when the main loop should call sleep_now()."""
+    return _sleep_requested
+
+
+def _configure_wake(speed_pin, buttons):
+    esp32.wake_on_ext0(pin=speed_pin, level=SPEED_WAKE_LEVEL)
+    pins = list(buttons)
+    if ALARM_PIN is not None:
+        pins.append(machine.Pin(ALARM_PIN, machine.Pin.IN))
+    # on the ESP32-S3 this level means "any pin low"
+    esp32.wake_on_ext1(pins=pins, level=esp32.WAKEUP_ALL_LOW)
+
+
+def sleep_now(tft, speed_pin, buttons, rotation):
+    """Save state, blank the panel and sleep until a wheel pulse or button.
+
+    Deep sleep restarts the firmware (boot skips the splash on a
+    DEEPSLEEP_RESET). Light sleep keeps RAM and the framebuffer and
+    returns after wake-up with the panel set up again in rotation; the
+    caller resolves its layouts and redraws the dashboard.
+    """
+    global _sleep_requested, _idle_since
+    _sleep_requested = False
+    _idle_since = None
+
+    powerloss.flush()
+    threaded = acquisition.USE_THREAD
+    if threaded:
+        acquisition.stop()
+    else:
+        scheduler.stop()
+    _configure_wake(speed_pin, buttons)
+
+    if DEEP_SLEEP:
+        tft_config.deinit(tft, display_off=True)
+        machine.deepsleep()
+
+    set_brightness(0)
+    tft_config.deinit(tft, display_off=True)
+    recovery.feed()  # the scheduler that feeds it is stopped while asleep
+    machine.lightsleep()
+    recovery.feed()
+
+    tft_config.LCD_POWER.value(1)
+    tft_config.RD.value(1)
+    tft.init()
+    tft.rotation(rotation)
+    if threaded:
+        acquisition.start()
+    else:
+        scheduler.start()
@@ -0,0 +1,70 @@
+import time
+
+import micropython
+from machine import Pin
+
+# ======================================================
+# Settings
+# ======================================================
+COLLAPSE_MV = 9000  # raw supply below this means the ignition is off
+RECOVER_MV = 11500  # re-arm once the supply is back above this
+REARM_MS = 5000  # and has stayed there this long (cranking dips)
+POWER_FAIL_PIN = None  # optional comparator output, active low
+
+_flushes = []  # (priority, name, fn), highest priority first
+_armed = True
+_recovered_at = None
+flush_count = 0
+last_flush_ms = 0
+
+
+def add_flush(name, fn, priority=0):
+    """Register fn() to persist state when power is about to be lost."""
+    _flushes.append((priority, name, fn))
+    _flushes.sort(key=lambda f: -f[0])
+
+
+def flush():
+    """Run every registered flush once, most important first."""
+    global flush_count, last_flush_ms
+    start = time.ticks_ms()
+    for _, name, fn in _flushes:
+        try:
+            fn()
+        except Exception as e:  # a failing flush must not block the rest
+            print("flush", name, "failed:", e)
+    flush_count += 1
+    last_flush_ms = time.ticks_diff(time.ticks_ms(), start)
+
+
+def _trigger(_=None):
+    global _armed, _recovered_at
+    if _armed:
+        _armed = False
+        _recovered_at = None
+        flush()
+
+
+def watch(monitor):
+    """VoltageMonitor listener: flush on collapse, re-arm on recovery."""
+    global _armed, _recovered_at
+    mv = monitor.raw_mv
+    if mv < COLLAPSE_MV:
+        _trigger()
+    elif not _armed and mv > RECOVER_MV:
+        now = time.ticks_ms()
+        if _recovered_at is None:
+            _recovered_at = now
+        elif time.ticks_diff(now, _recovered_at) > REARM_MS:
+            _armed = True
+    else:
+        _recovered_at = None
+
+
+def _on_fail_pin(pin):
+    micropython.schedule(_trigger, None)
+
+
+if POWER_FAIL_PIN is not None:
+    _fail_pin = Pin(POWER_FAIL_PIN, Pin.IN, Pin.PULL_UP)
+    _fail_pin.irq(trigger=Pin.IRQ_FALLING, handler=_on_fail_pin)
@@ -0,0 +1,146 @@
+import time
+
+from machine import Pin
+
+try:
+    from esp32 import PCNT
+except ImportError:
+    PCNT = None
+
+# ======================================================
+# Settings
+# ======================================================
+USE_PCNT = True  # hardware counter if the port has one
+PCNT_UNIT = 0
+PCNT_FILTER_NS = 12700  # hardware glitch filter, its maximum (~12.7 us)
+PCNT_LIMIT = 32767  # counter resets to 0 and raises IRQ_MAX here
+
+
+class IrqCounter:
+    """Count rising edges in a hard Python pin interrupt handler.
+
+    Edges closer than min_interval_us to the last accepted one cannot
+    come from the wheel and are counted in `rejected` instead. The
+    handler runs hard so pulse times are not delayed by a busy loop.
+    """
+
+    def __init__(self, pin, min_interval_us=0):
+        self.pin = pin
+        self.min_interval_us = min_interval_us
+        self.rejected = 0
+        self._count = 0
+        self._last_us = time.ticks_us()
+        self._stamp = None
+        pin.irq(trigger=Pin.IRQ_RISING, handler=self._on_pulse, hard=True)
+
+    def _on_pulse(self, pin):
+        """Increment pulse count on rising edge from wheel sensor."""
+        now = time.ticks_us()
+        if time.ticks_diff(now, self._last_us) < self.min_interval_us:
+            self.rejected += 1
+            return
+        self._last_us = now
+        self._count += 1
+        if self._stamp is not None:
+            self._stamp(now)
+
+    def set_stamp(self, fn):
+        """Call fn(ticks_us) from the interrupt for every accepted pulse."""
+        self._stamp = fn
+
+    def take(self):
+        """Return pulses counted since the last call."""
+        n = self._count
+        # subtract instead of zeroing so an IRQ between the two lines
+        # is carried over to the next interval
+        self._count -= n
+        return n
+
+    def deinit(self):
+        self.pin.irq(handler=None)
+
+
+class PcntCounter:
+    """Count rising edges with the ESP32 PCNT peripheral.
+
+    Edges are counted and glitch-filtered in hardware; Python only runs
+    once per PCNT_LIMIT pulses to account for counter wrap-around. The
+    hardware filter tops out at PCNT_FILTER_NS, far below a wheel pulse,
+    so take() drops the pulses that could not fit min_interval_us apart
+    since the last call and counts them in `rejected`.
+    """
+
+    def __init__(self, pin, unit=PCNT_UNIT, min_interval_us=0):
+        self.pin = pin
+        self.min_interval_us = min_interval_us
+        self.rejected = 0
+        self._wraps = 0
+        self._last_us = time.ticks_us()
+        self._take_us = self._last_us
+        self._stamp = None
+        self._pcnt = PCNT(
+            unit,
+            pin=pin,
+            rising=PCNT.INCREMENT,
+            filter=PCNT_FILTER_NS,
+            max=PCNT_LIMIT,
+        )
+        self._pcnt.irq(self._on_limit, PCNT.IRQ_MAX)
+        self._pcnt.start()
+
+    def _on_limit(self, pcnt):
+        self._wraps += 1
+
+    def set_stamp(self, fn):
+        """Call fn(ticks_us) from a hard pin interrupt for every pulse.
+
+        PCNT keeps counting on its own; the extra GPIO interrupt on the
+        same pin only runs while someone needs pulse times, and drops
+        edges closer than min_interval_us like IrqCounter does.
+        """
+        self._stamp = fn
+        if fn is None:
+            self.pin.irq(handler=None)
+        else:
+            self._last_us = time.ticks_us()
+            self.pin.irq(
+                handler=self._on_edge, trigger=Pin.IRQ_RISING, hard=True
+            )
+
+    def _on_edge(self, pin):
+        now = time.ticks_us()
+        if time.ticks_diff(now, self._last_us) < self.min_interval_us:
+            return
+        self._last_us = now
+        stamp = self._stamp
+        if stamp is not None:
+            stamp(now)
+
+    def take(self):
+        """Return pulses counted since the last call."""
+        value = self._pcnt.value(0)
+        wraps = self._wraps
+        self._wraps -= wraps
+        n = wraps * PCNT_LIMIT + value
+        now = time.ticks_us()
+        dt = time.ticks_diff(now, self._take_us)
+        self._take_us = now
+        if self.min_interval_us:
+            most = dt // self.min_interval_us + 1
+            if n > most:
+                self.rejected += n - most
+                n = most
+        return n
+
+    def deinit(self):
+        self._pcnt.deinit()
+
+
+def make_counter(pin, min_interval_us=0):
+    """Return a PCNT-backed counter if possible, else the IRQ fallback."""
+    if USE_PCNT and PCNT is not None:
+        try:
+            return PcntCounter(pin, min_interval_us=min_interval_us)
+        except (ValueError, OSError, TypeError):
+            pass
+    return IrqCounter(pin, min_interval_us)
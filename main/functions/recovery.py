@@ -0,0 +1,147 @@
+import struct
+from binascii import crc32
+
+import machine
+from functions import powerloss, scheduler
+
+# ======================================================
+# Settings
+# ======================================================
+WATCHDOG = True  # reset the board if the scheduler or render loop stalls
+WDT_TIMEOUT_MS = 8000
+FEED_MS = 1000
+SNAPSHOT_MS = 3000  # how often state is copied into RTC memory
+VERSION = 1
+# resets that keep RTC memory and should continue from the snapshot; a
+# power-on starts from the files on flash, and a soft reset keeps the
+# cause of the last hardware reset, so it is handled by stop()
+RESTORE_CAUSES = (
+    machine.WDT_RESET,
+    machine.HARD_RESET,
+    machine.DEEPSLEEP_RESET,
+)
+
+# magic, version, payload length, CRC-32 of the payload
+HEADER = "<4sBHI"
+HEADER_SIZE = struct.calcsize(HEADER)
+MAGIC = b"SNAP"
+
+_sections = []  # (name, size, pack_into(buf, offset), unpack_from(...))
+_buf = None
+_wdt = None
+_loop_watched = False  # feed only if the render loop called alive()
+_loop_alive = False
+restored = False  # this boot continued from a snapshot
+
+
+def add_section(name, size, pack_into, unpack_from):
+    """Include size bytes of state in the snapshot.
+
+    pack_into(buf, offset) writes them and unpack_from(buf, offset)
+    restores them. Register every section before restore() or start().
+    """
+    global _buf
+    _sections.append((name, size, pack_into, unpack_from))
+    _buf = None
+
+
+def _payload_size():
+    return sum(s[1] for s in _sections)
+
+
+def save():
+    """Scheduler task: pack every section into RTC memory.
+
+    RTC slow memory survives watchdog, panic, soft and deep sleep
+    resets but not a power cycle, where the CRC no longer matches.
+    """
+    global _buf
+    size = _payload_size()
+    if _buf is None:
+        _buf = bytearray(HEADER_SIZE + size)
+    offset = HEADER_SIZE
+    for _, n, pack_into, _ in _sections:
+        pack_into(_buf, offset)
+        offset += n
+    crc = crc32(memoryview(_buf)[HEADER_SIZE:])
+    struct.pack_into(HEADER, _buf, 0, MAGIC, VERSION, size, crc)
+    machine.RTC().memory(_buf)
+
+
+def restore():
+    """Load the sections from a valid snapshot; return True if there was one.
+
+    Only resets in RESTORE_CAUSES continue from the snapshot.
+    """
+    global restored
+    if machine.reset_cause() not in RESTORE_CAUSES:
+        return False
+    data = machine.RTC().memory()
+    size = _payload_size()
+    if len(data) != HEADER_SIZE + size:
+        return False
+    magic, version, n, crc = struct.unpack_from(HEADER, data, 0)
+    if (magic, version, n) != (MAGIC, VERSION, size):
+        return False
+    if crc32(memoryview(data)[HEADER_SIZE:]) != crc:
+        return False
+    offset = HEADER_SIZE
+    for _, n, _, unpack_from in _sections:
+        unpack_from(data, offset)
+        offset += n
+    restored = True
+    return True
+
+
+def feed():
+    """Scheduler task: feed the watchdog while the render loop is alive."""
+    global _loop_alive
+    if _wdt is not None and (_loop_alive or not _loop_watched):
+        _wdt.feed()
+        _loop_alive = False
+
+
+def alive():
+    """Render loop: check in once per iteration."""
+    global _loop_alive
+    _loop_alive = True
+
+
+def watch_loop(on):
+    """Require alive() between feeds, or not, e.g. around a blocking menu."""
+    global _loop_watched, _loop_alive
+    _loop_watched = on
+    _loop_alive = True
+
+
+def start():
+    """Start snapshots and, with WATCHDOG, the hardware watchdog.
+
+    The watchdog cannot be stopped once started. The scheduler feeds it
+    only while the render loop keeps calling alive(), so a stalled
+    timer wheel or a hung render loop resets the board and the next
+    boot continues from the last snapshot.
+    """
+    global _wdt
+    scheduler.add_task("snapshot", save, SNAPSHOT_MS)
+    if WATCHDOG:
+        _wdt = machine.WDT(timeout=WDT_TIMEOUT_MS)
+        scheduler.add_task("watchdog", feed, FEED_MS)
+        watch_loop(True)
+
+
+def stop():
+    """Leave the dashboard for the REPL or a file transfer session.
+
+    Flushes registered state to flash, then stops snapshots and drops
+    the current one: the files on flash are newer now, and the soft
+    reset that ends the session must not restore over them. The
+    watchdog keeps being fed by the scheduler alone.
+    """
+    powerloss.flush()
+    try:
+        scheduler.remove_task("snapshot")
+    except KeyError:
+        pass
+    machine.RTC().memory(b"")
+    watch_loop(False)
@@ -0,0 +1,208 @@
+import time
+
+from machine import Timer
+
+# ======================================================
+# Settings
+# ======================================================
+TICK_MS = 20  # resolution of the timer wheel; task periods are multiples
+TIMER_ID = 0  # the only hardware timer used for periodic work
+
+_tasks = []
+_tick = 0
+_timer = None
+_next_ms = None
+_busy_us = 0  # time spent inside tasks since the last take_busy_us()
+_wants = {}  # owner -> names of tasks it needs at full rate
+
+
+class Task:
+    """A periodic job on the timer wheel; period and phase are in ticks.
+
+    A task with an idle period drops to it (0 = not at all) while no
+    owner wants it; see want(). errors counts the runs that raised and
+    error keeps the last exception.
+    """
+
+    __slots__ = (
+        "name",
+        "fn",
+        "period",
+        "phase",
+        "enabled",
+        "full",
+        "idle",
+        "due",
+        "errors",
+        "error",
+    )
+
+    def __init__(self, name, fn, period, phase, idle=None):
+        self.name = name
+        self.fn = fn
+        self.period = period
+        self.phase = phase
+        self.enabled = True
+        self.full = period
+        self.idle = idle
+        self.due = False
+        self.errors = 0
+        self.error = None
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def _best_phase(period):
+    """Pick the phase that collides with the fewest registered tasks.
+
+    Two tasks with periods a, b and phases x, y ever fire in the same
+    tick exactly when x == y modulo gcd(a, b).
+    """
+    best, best_hits = 0, None
+    for phase in range(period):
+        hits = 0
+        for t in _tasks:
+            if (phase - t.phase) % _gcd(period, t.period) == 0:
+                hits += 1
+        if best_hits is None or hits < best_hits:
+            best, best_hits = phase, hits
+            if not hits:
+                break
+    return best
+
+
+def _ticks(period_ms):
+    return max(1, period_ms // TICK_MS)
+
+
+def add_task(name, fn, period_ms, phase_ms=None, idle_ms=None):
+    """Register fn() to run every period_ms, staggered against the rest.
+
+    With idle_ms the task runs that rarely (0: never) unless an owner
+    wants it through want().
+    """
+    period = _ticks(period_ms)
+    if phase_ms is None:
+        phase = _best_phase(period)
+    else:
+        phase = (phase_ms // TICK_MS) % period
+    if idle_ms is None:
+        idle = None
+    elif idle_ms:
+        idle = _ticks(idle_ms)
+    else:
+        idle = 0
+    task = Task(name, fn, period, phase, idle)
+    _tasks.append(task)
+    _apply_wants(task)
+    return task
+
+
+def set_period(name, period_ms):
+    """Change how often a task runs at full rate."""
+    task = _find(name)
+    task.full = _ticks(period_ms)
+    _apply_wants(task)
+
+
+def _apply_wants(task):
+    if task.idle is None:
+        task.period = task.full
+        return
+    wanted = False
+    for names in _wants.values():
+        if task.name in names:
+            wanted = True
+            break
+    period = task.full if wanted else task.idle
+    if period and (not task.period or period < task.period):
+        task.due = True  # speeding up: fresh value on the next tick
+    task.period = period
+
+
+def want(owner, names):
+    """Declare the tasks owner needs at full rate, replacing its last set.
+
+    Visible pages and loggers call this; tasks nobody wants fall back
+    to their idle period.
+    """
+    _wants[owner] = tuple(names)
+    for task in _tasks:
+        _apply_wants(task)
+
+
+def remove_task(name):
+    """Unregister a task."""
+    _tasks.remove(_find(name))
+
+
+def _find(name):
+    for t in _tasks:
+        if t.name == name:
+            return t
+    raise KeyError(name)
+
+
+def suspend(name):
+    """Stop running a task until resume()."""
+    _find(name).enabled = False
+
+
+def resume(name):
+    """Run a suspended task again."""
+    _find(name).enabled = True
+
+
+def _step(timer=None):
+    """Advance the wheel by one tick and run every task due in it."""
+    global _tick, _busy_us
+    _tick += 1
+    start = time.ticks_us()
+    for t in _tasks:
+        if not t.enabled or not t.period:
+            continue
+        if t.due or (_tick - t.phase) % t.period == 0:
+            t.due = False
+            try:
+                t.fn()
+            except Exception as e:  # one failing task must not stop the rest
+                t.errors += 1
+                t.error = e
+    _busy_us += time.ticks_diff(time.ticks_us(), start)
+
+
+def take_busy_us():
+    """Return the time spent running tasks since the last call."""
+    global _busy_us
+    busy, _busy_us = _busy_us, 0
+    return busy
+
+
+def start():
+    """Drive the wheel from one hardware timer."""
+    global _timer
+    _timer = Timer(TIMER_ID)
+    _timer.init(period=TICK_MS, mode=Timer.PERIODIC, callback=_step)
+
+
+def stop():
+    """Stop the hardware timer; tasks can still be run by run_pending()."""
+    global _timer
+    if _timer is not None:
+        _timer.deinit()
+        _timer = None
+
+
+def run_pending():
+    """Run the ticks that elapsed since the last call (polling mode)."""
+    global _next_ms
+    now = time.ticks_ms()
+    if _next_ms is None:
+        _next_ms = now
+    while time.ticks_diff(now, _next_ms) >= 0:
+        _step()
+        _next_ms = time.ticks_add(_next_ms, TICK_MS)
@@ -0,0 +1,93 @@
+from functions.markup import tft
+
+# Segment bits: a=top, b=upper right, c=lower right, d=bottom,
+# e=lower left, f=upper left, g=middle
+_DIGITS = (0x3F, 0x06, 0x5B, 0x4F, 0x66, 0x6D, 0x7D, 0x07, 0x7F, 0x6F)
+_BLANK = 0x00
+
+
+def _segment_rects(x, y, w, h, t):
+    """Return the seven (x, y, w, h) rectangles of one digit, a..g."""
+    mid = (h - t) // 2
+    low = h - mid - 2 * t
+    return (
+        (x + t, y, w - 2 * t, t),  # a
+        (x + w - t, y + t, t, mid - t),  # b
+        (x + w - t, y + mid + t, t, low),  # c
+        (x + t, y + h - t, w - 2 * t, t),  # d
+        (x, y + mid + t, t, low),  # e
+        (x, y + t, t, mid - t),  # f
+        (x + t, y + mid, w - 2 * t, t),  # g
+    )
+
+
+class SegmentNumber:
+    """Large seven-segment number drawn with precomputed fill_rect calls.
+
+    Only segments that differ from the previously drawn digit are
+    filled, so a speed change costs a few rectangles instead of a glyph
+    blit. Call invalidate() after anything else has drawn over it.
+    """
+
+    def __init__(
+        self, digits, width, height, thickness, spacing, fc, bc, x=0, y=0
+    ):
+        self.digits = digits
+        self.digit_width = width
+        self.height = height
+        self.thickness = thickness
+        self.spacing = spacing
+        self.width = digits * width + (digits - 1) * spacing
+        self.fc = fc
+        self.bc = bc
+        self.limit = 10**digits - 1
+        self.place(x, y)
+
+    def place(self, x, y):
+        """Move the number and precompute all segment rectangles."""
+        self.x = x
+        self.y = y
+        step = self.digit_width + self.spacing
+        self._rects = [
+            _segment_rects(
+                x + i * step, y, self.digit_width, self.height, self.thickness
+            )
+            for i in range(self.digits)
+        ]
+        self.invalidate()
+
+    def set_colors(self, fc, bc):
+        """Change colours; the next draw() repaints the whole number."""
+        self.fc = fc
+        self.bc = bc
+        self.invalidate()
+
+    def invalidate(self):
+        """Force a full redraw on the next draw() call."""
+        self._shown = None
+
+    def draw(self, value):
+        """Draw a non-negative integer, right-aligned, without leading 0s."""
+        value = max(0, min(self.limit, int(value)))
+        if self._shown is None:
+            tft.fill_rect(self.x, self.y, self.width, self.height, self.bc)
+            self._shown = [_BLANK] * self.digits
+
+        last = self.digits - 1
+        for pos in range(last, -1, -1):
+            if value or pos == last:
+                mask = _DIGITS[value % 10]
+            else:
+                mask = _BLANK
+            value //= 10
+            changed = mask ^ self._shown[pos]
+            if not changed:
+                continue
+            rects = self._rects[pos]
+            for seg in range(7):
+                bit = 1 << seg
+                if changed & bit:
+                    rx, ry, rw, rh = rects[seg]
+                    color = self.fc if mask & bit else self.bc
+                    tft.fill_rect(rx, ry, rw, rh, color)
+            self._shown[pos] = mask
@@ -0,0 +1,48 @@
+import time
+
+import machine
+import s3lcd
+
+# ======================================================
+# Settings
+# ======================================================
+FRAME_MS = 20  # 50 fps
+DURATION_MS = 400  # slide-in time
+HOLD_MS = 1000  # logo stays on screen after sliding in
+COLD_RESETS = (machine.PWRON_RESET, machine.HARD_RESET)
+
+
+def is_cold_boot():
+    """Return True after power-on or reset button, False on warm resets."""
+    return machine.reset_cause() in COLD_RESETS
+
+
+def play_logo(tft, assets, name="logo"):
+    """Slide the logo in from the bottom edge at a fixed frame rate.
+
+    The logo is decoded once and each frame blits the visible rows of
+    that sprite. s3lcd pushes the whole framebuffer on show(), so the
+    panel's vertical scroll area (TFA/BFA) would be overwritten by the
+    next frame; a sprite blit gives the same result with no extra cost.
+    """
+    sprite = assets.cache(name)
+    w, h = assets.size(name)
+    height = tft.height()
+    stride = w * 2
+    frames = max(1, DURATION_MS // FRAME_MS)
+
+    tft.fill(s3lcd.BLACK)
+    deadline = time.ticks_ms()
+    for frame in range(1, frames + 1):
+        pos = height - (height * frame) // frames
+        rows = min(h, height - pos)
+        tft.blit_buffer(sprite[: rows * stride], 0, pos, w, rows)
+        tft.show()
+
+        deadline = time.ticks_add(deadline, FRAME_MS)
+        wait = time.ticks_diff(deadline, time.ticks_ms())
+        if wait > 0:
+            time.sleep_ms(wait)
+
+    assets.release(name)
+    time.sleep_ms(HOLD_MS)
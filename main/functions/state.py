@@ -0,0 +1,92 @@
+from array import array
+
+# ======================================================
+# Fields
+# ======================================================
+SPEED = 0
+TRIP = 1
+FUEL = 2
+RANGE = 3
+VOLTAGE = 4
+GEAR = 5
+TEMPERATURE = 6
+HUMIDITY = 7
+TIME = 8
+FIELDS = 9
+
+
+class SensorState:
+    """Latest sensor values guarded by a sequence counter (seqlock).
+
+    Writers wrap updates in begin()/end(); the counter is odd while a
+    write is in progress. Every field remembers the sequence number of
+    its last change so readers can skip fields that did not change.
+    """
+
+    __slots__ = ("seq", "values", "versions")
+
+    def __init__(self, fields=FIELDS):
+        self.seq = 0
+        self.values = [None] * fields
+        self.versions = array("I", [0] * fields)
+
+    def begin(self):
+        self.seq += 1
+
+    def end(self):
+        self.seq += 1
+
+    def set(self, field, value):
+        """Store a value; call between begin() and end()."""
+        if self.values[field] != value:
+            self.values[field] = value
+            self.versions[field] = self.seq + 1
+
+    def publish(self, field, value):
+        """Store a single value as its own write."""
+        self.begin()
+        self.set(field, value)
+        self.end()
+
+
+class Snapshot:
+    """Consistent, reusable copy of a SensorState for one frame."""
+
+    __slots__ = ("state", "values", "versions", "version", "since")
+
+    def __init__(self, state):
+        self.state = state
+        self.values = [None] * len(state.values)
+        self.versions = array("I", state.versions)
+        self.version = 0
+        self.since = 0
+
+    def take(self):
+        """Copy the state; retry if a writer ran during the copy."""
+        state = self.state
+        while True:
+            seq = state.seq
+            if seq & 1:
+                continue
+            self.values[:] = state.values
+            self.versions[:] = state.versions
+            if state.seq == seq:
+                break
+        self.since = self.version
+        self.version = seq
+        return self.values
+
+    def changed(self, field):
+        """Return True if field changed between the last two take() calls."""
+        return self.versions[field] > self.since
+
+    def any_changed(self):
+        """Return True if any field changed between the last two take()."""
+        return max(self.versions) > self.since
+
+    def invalidate(self):
+        """Treat every field as changed on the next take()."""
+        self.version = 0
+
+
+state = SensorState()
@@ -0,0 +1,147 @@
+import struct
+import sys
+import time
+from array import array
+
+import micropython
+from functions import scheduler
+
+# ======================================================
+# Settings
+# ======================================================
+ENABLED = False  # stream frames over USB from boot
+RATE_HZ = 25  # frames per second; 1000 // RATE_HZ is a multiple of TICK_MS
+SYNC = 0x55AA  # first two bytes of every frame: AA 55
+
+# sync, sequence, ticks_ms, speed 0.1 km/h, trip m, fuel 0.1 L,
+# range km, supply mV, temperature 0.1 C, humidity %, gear (ASCII),
+# flags, CRC16 of everything between sync and CRC
+FRAME = "<HHIHIHHHhBBBH"
+FRAME_SIZE = struct.calcsize(FRAME)
+
+# values sent for fields that have none ("not calib", DHT "err")
+MISSING = 0xFFFF
+MISSING_TEMP = -32768
+MISSING_BYTE = 0xFF
+
+FLAG_UNDER = 0x01  # supply under-voltage alarm
+FLAG_OVER = 0x02  # supply over-voltage alarm
+FLAG_STOPPED = 0x04  # wheel standing still
+
+# sampling tasks kept at full rate while streaming
+SOURCES = ("fuel", "range", "env", "inputs", "voltage")
+
+_read = None
+_stream = None
+_rate_hz = RATE_HZ
+_running = False
+_frame = bytearray(FRAME_SIZE)
+_seq = 0
+sent = 0
+
+
+def _crc_table():
+    table = array("H", [0] * 256)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+        table[i] = crc & 0xFFFF
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+@micropython.native
+def crc16(buf, start, end):
+    """CRC-16/CCITT-FALSE of buf[start:end] (host: binascii.crc_hqx)."""
+    table = _CRC_TABLE
+    crc = 0xFFFF
+    for i in range(start, end):
+        crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ buf[i]]
+    return crc
+
+
+def _scaled(value, scale, missing):
+    if isinstance(value, (int, float)):
+        return int(value * scale)
+    return missing
+
+
+def encode(buf, seq, ms, values):
+    """Pack one frame into buf.
+
+    values is (speed km/h, trip km, fuel L, range km, supply mV,
+    temperature C, humidity %, gear, flags); non-numbers mean missing.
+    """
+    speed, trip, fuel, rng, mv, temp, hum, gear, flags = values
+    struct.pack_into(
+        FRAME,
+        buf,
+        0,
+        SYNC,
+        seq & 0xFFFF,
+        ms & 0xFFFFFFFF,
+        _scaled(speed, 10, MISSING),
+        _scaled(trip, 1000, 0),
+        _scaled(fuel, 10, MISSING),
+        _scaled(rng, 1, MISSING),
+        _scaled(mv, 1, MISSING),
+        _scaled(temp, 10, MISSING_TEMP),
+        _scaled(hum, 1, MISSING_BYTE),
+        ord(str(gear)[0]),
+        flags,
+        0,
+    )
+    struct.pack_into("<H", buf, FRAME_SIZE - 2, crc16(buf, 2, FRAME_SIZE - 2))
+
+
+def _send():
+    """Scheduler task: sample the getters and write one frame."""
+    global _seq, sent
+    encode(_frame, _seq, time.ticks_ms(), _read())
+    _seq += 1
+    try:
+        _stream.write(_frame)
+        sent += 1
+    except OSError:  # host not listening; the next frame tries again
+        pass
+
+
+def start(read, rate_hz=RATE_HZ, stream=None):
+    """Stream frames of read() values at rate_hz.
+
+    Frames go to the USB CDC console unless another binary stream is
+    given. They share it with print(); the receiver resyncs on SYNC and
+    drops anything that fails the CRC.
+    """
+    global _read, _stream, _rate_hz, _running
+    _read = read
+    _stream = stream if stream is not None else sys.stdout.buffer
+    _rate_hz = rate_hz
+    period = max(scheduler.TICK_MS, 1000 // rate_hz)
+    try:
+        scheduler.remove_task("telemetry")
+    except KeyError:
+        pass
+    scheduler.add_task("telemetry", _send, period)
+    scheduler.want("telemetry", SOURCES)
+    _running = True
+
+
+def stop():
+    """Stop streaming."""
+    global _running
+    scheduler.remove_task("telemetry")
+    scheduler.want("telemetry", ())
+    _running = False
+
+
+def running():
+    return _running
+
+
+def resume():
+    """Stream again with the settings of the last start()."""
+    start(_read, _rate_hz, _stream)
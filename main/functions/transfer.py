@@ -0,0 +1,259 @@
+import os
+import select
+import struct
+import sys
+from binascii import crc32
+
+import micropython
+from functions import recovery, telemetry
+
+# ======================================================
+# Settings
+# ======================================================
+CHUNK = 4096  # payload bytes per DATA packet
+WINDOW = 8  # DATA packets in flight before waiting for an ACK
+TIMEOUT_MS = 2000  # resend / give up on a silent peer
+IDLE_MS = 30000  # leave serve() after this long without requests
+
+# Packet: header, payload, CRC-32 of header and payload. arg carries the
+# offset, size, count or checksum the packet type calls for.
+MAGIC = 0xA5
+HEADER = "<BBHI"  # magic, type, payload length, arg
+HEADER_SIZE = struct.calcsize(HEADER)
+
+# requests (host -> device)
+LIST = 0x01  # payload: directory
+GET = 0x02  # payload: path, arg: start offset
+PUT = 0x03  # payload: path, arg: total size
+SUM = 0x04  # payload: path, arg: length to checksum (OK payload: length)
+BYE = 0x05
+RM = 0x06  # payload: path
+# replies and flow control
+OK = 0x10
+ERR = 0x11  # payload: message
+DATA = 0x12  # payload: bytes, arg: file offset
+ACK = 0x13  # arg: next offset expected
+NAK = 0x14  # arg: offset to resend from
+END = 0x15  # arg: file size or entry count
+ENTRY = 0x16  # payload: name, arg: size (DIR_SIZE for directories)
+
+BAD = (0, 0, None)  # what _recv() returns for a damaged packet
+DIR_SIZE = 0xFFFFFFFF
+PART_SUFFIX = ".part"  # uploads land here until complete
+
+
+class Service:
+    """File transfer over a byte stream.
+
+    LIST, GET and PUT move files in CRC-checked DATA packets with a
+    sliding window and go-back-N recovery; a GET may start at any
+    offset and a PUT continues an earlier .part file, so interrupted
+    transfers resume. One packet buffer is allocated up front.
+    """
+
+    def __init__(self, inp, out, root=""):
+        self.inp = inp
+        self.out = out
+        self.root = root
+        self._buf = bytearray(HEADER_SIZE + CHUNK + 4)
+        self._mv = memoryview(self._buf)
+        self._rx = bytearray(HEADER_SIZE + CHUNK + 4)
+        self._rxmv = memoryview(self._rx)
+        self._poll = select.poll()
+        self._poll.register(inp, select.POLLIN)
+
+    # --------------------------
+    # Packets
+    # --------------------------
+    def _send(self, ptype, arg=0, payload=None, n=None):
+        """Send a packet; with n, the payload is already in the buffer."""
+        mv = self._mv
+        if payload is not None:
+            n = len(payload)
+            mv[HEADER_SIZE : HEADER_SIZE + n] = payload
+        elif n is None:
+            n = 0
+        struct.pack_into(HEADER, mv, 0, MAGIC, ptype, n, arg)
+        end = HEADER_SIZE + n
+        struct.pack_into("<I", mv, end, crc32(mv[:end]))
+        self.out.write(mv[: end + 4])
+
+    def _read(self, mv, timeout_ms):
+        """Fill mv from the input; False if the peer goes quiet."""
+        got, n = 0, len(mv)
+        while got < n:
+            if not self._poll.poll(timeout_ms):
+                return False
+            k = self.inp.readinto(mv[got:])
+            if k:
+                got += k
+        return True
+
+    def _recv(self, timeout_ms=TIMEOUT_MS):
+        """Return (type, arg, payload), None on timeout, BAD on damage."""
+        rx = self._rxmv
+        while True:
+            if not self._read(rx[:1], timeout_ms):
+                return None
+            if rx[0] == MAGIC:
+                break
+        if not self._read(rx[1:HEADER_SIZE], timeout_ms):
+            return None
+        _, ptype, n, arg = struct.unpack_from(HEADER, rx, 0)
+        if n > CHUNK:
+            return BAD
+        end = HEADER_SIZE + n
+        if not self._read(rx[HEADER_SIZE : end + 4], timeout_ms):
+            return None
+        if struct.unpack_from("<I", rx, end)[0] != crc32(rx[:end]):
+            return BAD
+        return ptype, arg, rx[HEADER_SIZE:end]
+
+    # --------------------------
+    # Requests
+    # --------------------------
+    def _path(self, payload):
+        return self.root + bytes(payload).decode()
+
+    def _list(self, path):
+        count = 0
+        for name in os.listdir(path or "/"):
+            st = os.stat(path.rstrip("/") + "/" + name)
+            size = DIR_SIZE if st[0] & 0x4000 else st[6]
+            self._send(ENTRY, size, name.encode())
+            count += 1
+        self._send(END, count)
+
+    def _sum(self, path, length):
+        crc = done = 0
+        data = self._mv[HEADER_SIZE : HEADER_SIZE + CHUNK]
+        with open(path, "rb") as f:
+            while length > 0:
+                n = f.readinto(data[: min(CHUNK, length)])
+                if not n:
+                    break
+                crc = crc32(data[:n], crc)
+                length -= n
+                done += n
+        self._send(OK, crc, struct.pack("<I", done))
+
+    def _get(self, path, offset):
+        size = os.stat(path)[6]
+        data = self._mv[HEADER_SIZE : HEADER_SIZE + CHUNK]
+        self._send(OK, size)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            sent = acked = offset
+            quiet = 0
+            while acked < size:
+                while sent < size and sent - acked < WINDOW * CHUNK:
+                    n = f.readinto(data[: min(CHUNK, size - sent)])
+                    self._send(DATA, sent, n=n)
+                    sent += n
+                reply = self._recv()
+                if reply is None:  # the host NAKs what it is missing
+                    quiet += TIMEOUT_MS
+                    if quiet >= IDLE_MS:
+                        return
+                    continue
+                quiet = 0
+                ptype, arg, _ = reply
+                if ptype == ACK and arg > acked:
+                    acked = arg
+                elif ptype == NAK:
+                    acked = sent = arg
+                    f.seek(arg)
+                elif ptype == BYE:
+                    return
+        self._send(END, size)
+
+    def _put(self, path, size):
+        part = path + PART_SUFFIX
+        try:
+            offset = os.stat(part)[6]
+        except OSError:
+            offset = 0
+        if offset > size:  # left over from a different upload
+            os.remove(part)
+            offset = 0
+        with open(part, "ab") as f:
+            self._send(OK, offset)
+            quiet = 0
+            nak_at = None
+            while offset < size:
+                packet = self._recv()
+                if packet is None:
+                    quiet += TIMEOUT_MS
+                    if quiet >= IDLE_MS:
+                        return
+                    self._send(NAK, offset)
+                    continue
+                quiet = 0
+                ptype, arg, payload = packet
+                if ptype == BYE:
+                    return
+                if ptype != DATA or arg != offset:
+                    # damaged, or in flight behind a lost one: ask once
+                    if nak_at != offset:
+                        nak_at = offset
+                        self._send(NAK, offset)
+                    continue
+                f.write(payload)
+                offset += len(payload)
+                nak_at = None
+                self._send(ACK, offset)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        os.rename(part, path)
+        self._send(END, size)
+
+    def serve(self, idle_ms=IDLE_MS):
+        """Answer requests until BYE or idle_ms of silence."""
+        while True:
+            packet = self._recv(idle_ms)
+            if packet is None:
+                return
+            ptype, arg, payload = packet
+            if ptype == BYE:
+                self._send(OK)
+                return
+            try:
+                if ptype == LIST:
+                    self._list(self._path(payload))
+                elif ptype == GET:
+                    self._get(self._path(payload), arg)
+                elif ptype == PUT:
+                    self._put(self._path(payload), arg)
+                elif ptype == SUM:
+                    self._sum(self._path(payload), arg)
+                elif ptype == RM:
+                    os.remove(self._path(payload))
+                    self._send(OK)
+                elif ptype:
+                    self._send(ERR, 0, b"bad request")
+            except OSError as e:
+                self._send(ERR, 0, str(e).encode())
+
+
+def serve():
+    """Run the service on the USB console (tools/transfer.py starts it).
+
+    recovery.stop() saves registered state first, so trip.json and
+    friends are current, and drops the RTC snapshot, so the soft reset
+    that ends the session does not restore over uploaded files. Then
+    telemetry is paused, as its frames would corrupt packets on the
+    same line, and Ctrl-C is off while binary data is on the line.
+    """
+    recovery.stop()
+    streaming = telemetry.running()
+    if streaming:
+        telemetry.stop()
+    micropython.kbd_intr(-1)
+    try:
+        Service(sys.stdin.buffer, sys.stdout.buffer).serve()
+    finally:
+        micropython.kbd_intr(3)
+        if streaming:
+            telemetry.resume()
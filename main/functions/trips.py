@@ -0,0 +1,192 @@
+import math
+import struct
+
+# ======================================================
+# Settings
+# ======================================================
+TRIPS_FILE = "../trips.bin"
+VERSION = 1
+REFUEL_L = 3  # a fuel level rise this large starts a new tank trip
+MEAN_SHIFT = 4  # fixed-point bits of the running mean speed
+
+# metres, mm, moving s, moving ms, stopped s, stopped ms, max 0.1 km/h,
+# samples, mean (0.1 km/h << MEAN_SHIFT), variance (same units squared)
+RECORD = "<IHIHIHHIII"
+RECORD_SIZE = struct.calcsize(RECORD)
+HEADER = "<BB"  # version, record count
+HEADER_SIZE = struct.calcsize(HEADER)
+
+
+class Trip:
+    """Running totals of one trip in integer units.
+
+    update() is O(1) and keeps no history: distance and times carry
+    into whole metres and seconds, and the mean and variance of the
+    moving speed follow Welford's recurrence in fixed point, which keeps
+    every field a small int.
+    """
+
+    __slots__ = (
+        "name",
+        "m",
+        "mm",
+        "move_s",
+        "move_ms",
+        "stop_s",
+        "stop_ms",
+        "max_v",
+        "n",
+        "mean",
+        "var",
+    )
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.m = self.mm = 0
+        self.move_s = self.move_ms = 0
+        self.stop_s = self.stop_ms = 0
+        self.max_v = self.n = self.mean = self.var = 0
+
+    def update(self, mm, dt_ms, v):
+        """Add mm travelled in dt_ms at speed v (0.1 km/h)."""
+        self.mm += mm
+        if self.mm >= 1000:
+            self.m += self.mm // 1000
+            self.mm %= 1000
+        if not v:
+            self.stop_ms += dt_ms
+            if self.stop_ms >= 1000:
+                self.stop_s += self.stop_ms // 1000
+                self.stop_ms %= 1000
+            return
+        self.move_ms += dt_ms
+        if self.move_ms >= 1000:
+            self.move_s += self.move_ms // 1000
+            self.move_ms %= 1000
+        if v > self.max_v:
+            self.max_v = v
+        x = v << MEAN_SHIFT
+        self.n += 1
+        n = self.n
+        half = n >> 1  # round to nearest so the mean does not drift down
+        d = x - self.mean
+        self.mean += (d + half) // n
+        self.var += (d * (x - self.mean) - self.var + half) // n
+
+    # --------------------------
+    # Display units
+    # --------------------------
+    @property
+    def km(self):
+        return self.m / 1000
+
+    @property
+    def avg_kph(self):
+        """Average moving speed: distance over moving time."""
+        return self.m * 3.6 / self.move_s if self.move_s else 0.0
+
+    @property
+    def max_kph(self):
+        return self.max_v / 10
+
+    @property
+    def sd_kph(self):
+        """Standard deviation of the moving speed."""
+        return math.sqrt(self.var) / (10 << MEAN_SHIFT)
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def pack_into(self, buf, offset):
+        struct.pack_into(
+            RECORD,
+            buf,
+            offset,
+            self.m,
+            self.mm,
+            self.move_s,
+            self.move_ms,
+            self.stop_s,
+            self.stop_ms,
+            self.max_v,
+            self.n,
+            self.mean,
+            self.var,
+        )
+
+    def unpack_from(self, buf, offset):
+        (
+            self.m,
+            self.mm,
+            self.move_s,
+            self.move_ms,
+            self.stop_s,
+            self.stop_ms,
+            self.max_v,
+            self.n,
+            self.mean,
+            self.var,
+        ) = struct.unpack_from(RECORD, buf, offset)
+
+
+A = Trip("A")  # reset together with the dashboard trip
+B = Trip("B")
+TANK = Trip("Tank")  # reset on refuel
+TRIPS = (A, B, TANK)
+
+SIZE = HEADER_SIZE + RECORD_SIZE * len(TRIPS)
+
+_buf = bytearray(SIZE)
+_fuel = None
+
+
+def update(mm, dt_ms, v):
+    """Feed one measurement interval to every trip."""
+    for trip in TRIPS:
+        trip.update(mm, dt_ms, v)
+
+
+def note_fuel(litres):
+    """Start a new tank trip when the fuel level jumps up."""
+    global _fuel
+    if _fuel is not None and litres - _fuel >= REFUEL_L:
+        TANK.reset()
+    _fuel = litres
+
+
+def pack_into(buf, offset):
+    """Write all trips (SIZE bytes) into buf."""
+    struct.pack_into(HEADER, buf, offset, VERSION, len(TRIPS))
+    for i, trip in enumerate(TRIPS):
+        trip.pack_into(buf, offset + HEADER_SIZE + i * RECORD_SIZE)
+
+
+def unpack_from(buf, offset):
+    """Restore the trips from pack_into() data; False if it is foreign."""
+    version, count = struct.unpack_from(HEADER, buf, offset)
+    if version != VERSION or count != len(TRIPS):
+        return False
+    for i, trip in enumerate(TRIPS):
+        trip.unpack_from(buf, offset + HEADER_SIZE + i * RECORD_SIZE)
+    return True
+
+
+def load():
+    """Restore the trips; a missing or foreign file leaves them at zero."""
+    try:
+        with open(TRIPS_FILE, "rb") as f:
+            n = f.readinto(_buf)
+    except OSError:
+        return
+    if n == SIZE:
+        unpack_from(_buf, 0)
+
+
+def save():
+    """Write all trips to TRIPS_FILE (98 bytes)."""
+    pack_into(_buf, 0)
+    with open(TRIPS_FILE, "wb") as f:
+        f.write(_buf)
@@ -0,0 +1,129 @@
+from array import array
+
+# ======================================================
+# Settings
+# ======================================================
+# Supply / pin voltage ratio of the divider, (R_high + R_low) / R_low.
+# 5/1 keeps the previous raw / 4095 * 15 * 1.1 full scale of 16.5 V.
+DIVIDER_NUM = 5
+DIVIDER_DEN = 1
+OVERSAMPLE = 8  # read_uv() calls averaged per sample
+FILTER_SHIFT = 3  # EMA weight 1/8 per sample
+
+UNDER_ON = 11800  # mV, under-voltage alarm raised below this
+UNDER_OFF = 12200  # mV, and cleared above this
+OVER_ON = 15000  # mV, regulator failure alarm raised above this
+OVER_OFF = 14700  # mV, and cleared below this
+CRANK_DROP = 1500  # mV below the filtered level counts as a cranking dip
+
+# Measured pin voltage -> true pin voltage (mV), from calibrating against
+# a multimeter. The ESP32 ADC reads low near the top of the 11 dB range.
+CORRECTION_POINTS = (
+    (0, 0),
+    (2500, 2500),
+    (2800, 2830),
+    (3100, 3160),
+)
+TABLE_STEP = 50  # mV per entry of the precomputed correction table
+
+
+def _build_table(points, step):
+    """Precompute corrected mV at every step by linear interpolation."""
+    top = points[-1][0]
+    table = array("H", [0] * (top // step + 2))
+    j = 0
+    for i in range(len(table)):
+        x = i * step
+        while j < len(points) - 2 and x > points[j + 1][0]:
+            j += 1
+        (x0, y0), (x1, y1) = points[j], points[j + 1]
+        table[i] = max(0, y0 + (x - x0) * (y1 - y0) // (x1 - x0))
+    return table
+
+
+class VoltageMonitor:
+    """Oversampled, corrected and filtered supply voltage with alarms.
+
+    sample() does all ADC work and runs from the scheduler at a fixed
+    rate; everything else only reads cached integers (mV).
+    """
+
+    def __init__(self, adc):
+        self.adc = adc
+        self._table = _build_table(CORRECTION_POINTS, TABLE_STEP)
+        self.raw_mv = 0  # last oversampled value, unfiltered
+        self.mv = 0  # filtered value
+        self.min_mv = 0
+        self.max_mv = 0
+        self.under = False
+        self.over = False
+        self.crank_count = 0
+        self.crank_min_mv = 0
+        self._cranking = False
+        self._primed = False  # the filter starts at the first sample
+        self._listeners = []
+
+    def add_listener(self, fn):
+        """Call fn(monitor) after every sample."""
+        self._listeners.append(fn)
+
+    def _correct(self, pin_mv):
+        """Map a measured pin voltage through the correction table."""
+        table = self._table
+        i = pin_mv // TABLE_STEP
+        if i >= len(table) - 1:
+            return table[-1]
+        lo = table[i]
+        return lo + (table[i + 1] - lo) * (pin_mv % TABLE_STEP) // TABLE_STEP
+
+    def sample(self, timer=None):
+        """Read the ADC and update filter, extremes, alarms and dips."""
+        total = 0
+        for _ in range(OVERSAMPLE):
+            total += self.adc.read_uv()
+        pin_mv = self._correct(total // (OVERSAMPLE * 1000))
+        mv = pin_mv * DIVIDER_NUM // DIVIDER_DEN
+        self.raw_mv = mv
+
+        if not self._primed:
+            self._primed = True
+            self.mv = self.min_mv = self.max_mv = mv
+        else:
+            self.mv += (mv - self.mv) >> FILTER_SHIFT
+        filtered = self.mv
+        if filtered < self.min_mv:
+            self.min_mv = filtered
+        if filtered > self.max_mv:
+            self.max_mv = filtered
+
+        # alarms with hysteresis on the filtered value
+        if self.under:
+            self.under = filtered < UNDER_OFF
+        else:
+            self.under = filtered < UNDER_ON
+        if self.over:
+            self.over = filtered > OVER_OFF
+        else:
+            self.over = filtered > OVER_ON
+
+        # cranking dips show on the raw value long before the filter moves
+        if mv < filtered - CRANK_DROP:
+            if not self._cranking:
+                self._cranking = True
+                self.crank_count += 1
+                self.crank_min_mv = mv
+            elif mv < self.crank_min_mv:
+                self.crank_min_mv = mv
+        else:
+            self._cranking = False
+
+        for fn in self._listeners:
+            fn(self)
+
+    def reset_extremes(self):
+        """Start a new min/max session from the current value."""
+        self.min_mv = self.max_mv = self.mv
+
+    def volts(self):
+        """Return the filtered voltage in volts, rounded to 0.1 V."""
+        return (self.mv + 50) // 100 / 10
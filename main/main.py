@@ -1,24 +1,292 @@
 import time
 
 import s3lcd
-from fonts import vga2_bold_16x32 as big
-from functions.brightness_control import update_brightness
+from functions import (
+    acquisition,
+    alerts,
+    histograms,
+    memdiag,
+    palette,
+    power,
+    recovery,
+    scheduler,
+    telemetry,
+    trips,
+)
+from functions.assets import AssetPack
+from functions.banner import Banner
+from functions.bars import BarChart
+from functions.binfont import BIG_FONT, SMALL_FONT, load_font
+from functions.brightness_control import (
+    UPDATE_INTERVAL,
+    is_night,
+    reapply_pwm,
+    update_brightness,
+)
+from functions.config import config
+from functions.governor import WINDOW_MS, Governor
 from functions.handlers import (
     get_fuel_level,
-    get_remaining_range,
-    get_speed,
-    get_transmission,
-    get_trip_km,
-    get_voltage,
-    humidity,
-    read_time,
-    temperature,
+    get_sensor_diagnostics,
+    get_telemetry,
+    get_temperature_c,
+    get_voltage_stats,
+    is_stopped,
+    set_pulse_stamp,
+    speed_pin,
+    voltage,
 )
+from functions.layout import Layout, Slot
 from functions.markup import Markup, tft
 from functions.menu import show_menu
+from functions.pages import Page, Pager, table_page
+from functions.perftimer import NAMES, PerfTimer
+from functions.segments import SegmentNumber
+from functions.splash import is_cold_boot, play_logo
+from functions.state import (
+    FUEL,
+    GEAR,
+    HUMIDITY,
+    RANGE,
+    SPEED,
+    TEMPERATURE,
+    TIME,
+    TRIP,
+    VOLTAGE,
+    Snapshot,
+    state,
+)
 from tft_drivers.tft_buttons import Buttons
 
+big = load_font(BIG_FONT)
+small = load_font(SMALL_FONT)
 markup = Markup()
+assets = AssetPack(tft)
+memdiag.mark("fonts, assets")
+
+dashboard = Layout(
+    (
+        Slot("time", "center", big, 5),
+        Slot("fuel", "top_left", big, 5, s3lcd.BLACK, s3lcd.YELLOW, 26, 1),
+        Slot("trip", "left_center", big, 6),
+        Slot(
+            "voltage", "top_right", big, 5, s3lcd.BLACK, s3lcd.GREEN, -40, -1
+        ),
+        Slot("humidity", "right_center", big, 4),
+        Slot("temp", "bottom_right", big, 5, s3lcd.BLACK, s3lcd.CYAN, -27, -1),
+        Slot("range", "bottom_left", big, 6, s3lcd.BLACK, s3lcd.RED, 26, -1),
+        Slot("gear", "top_center", big, 2, s3lcd.BLACK, s3lcd.WHITE, 0, 4),
+    )
+)
+
+# state field -> dashboard slot and text format
+DASHBOARD_FIELDS = (
+    (TIME, "time", "{}"),
+    (FUEL, "fuel", "{}L"),
+    (TRIP, "trip", "{}"),
+    (VOLTAGE, "voltage", "{}v"),
+    (HUMIDITY, "humidity", "{}"),
+    (TEMPERATURE, "temp", "{}"),
+    (RANGE, "range", "{}km"),
+    (GEAR, "gear", "{}"),
+)
+IDLE_MS = 20  # sleep when no field changed since the last frame
+ROTATION = 3  # landscape
+BACKGROUND = "background_n"
+
+# bottom-centre speed readout, 3 digits of 18x48 px
+speedo = SegmentNumber(3, 18, 48, 5, 5, s3lcd.BLACK, s3lcd.WHITE)
+
+governor = Governor()
+governor.add_hook(reapply_pwm)
+
+
+def _supply_range():
+    stats = get_voltage_stats()
+    return f"{stats['min']:.1f}-{stats['max']:.1f}"
+
+
+def _rejects():
+    diag = get_sensor_diagnostics()
+    return f"{diag['rejected_pulses']}/{diag['rejected_samples']}"
+
+
+def _hm(seconds):
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}"
+
+
+def trip_page(trip):
+    """Statistics of one trips.Trip, read only while the page is shown."""
+
+    def speeds():
+        return f"{trip.avg_kph:.0f}/{trip.max_kph:.0f}"
+
+    def times():
+        return f"{_hm(trip.move_s)}/{_hm(trip.stop_s)}"
+
+    return table_page(
+        "trip_" + trip.name,
+        "Trip " + trip.name,
+        big,
+        (
+            ("Distance", lambda: trip.km, "{:.1f}km"),
+            ("Avg/max", speeds, "{}"),
+            ("Spread", lambda: trip.sd_kph, "{:.1f}"),
+            ("Move/stop", times, "{}"),
+        ),
+    )
+
+
+# time in gear above its axis, time in speed bands below
+gear_chart = BarChart(
+    len(histograms.GEARS), 32, 16, 50, s3lcd.CYAN, s3lcd.BLACK
+)
+band_chart = BarChart(
+    histograms.BANDS, 20, 16, 50, s3lcd.YELLOW, s3lcd.BLACK, 2, 86
+)
+histogram_page = Page(
+    "histograms",
+    Layout(
+        (
+            Slot("gears", "top_left", big, 13, oy=52),
+            Slot("title", "top_right", big, 5),
+            Slot("low", "bottom_left", big, 2),
+            Slot("unit", "bottom_center", big, 4),
+            Slot("high", "bottom_right", big, 4),
+        )
+    ),
+    (
+        (lambda: histograms.gear_s, gear_chart, None),
+        (lambda: histograms.band_s, band_chart, None),
+    ),
+    labels=(
+        ("gears", " ".join(str(g) for g in histograms.GEARS)),
+        ("title", "Gears"),
+        ("low", "0"),
+        ("unit", "km/h"),
+        ("high", histograms.band_label(histograms.BANDS - 1)),
+    ),
+)
+
+perf = PerfTimer(config.m_per_pulse, set_pulse_stamp)
+
+
+def _apply_config(cfg):
+    perf.metres_per_pulse = cfg.m_per_pulse
+
+
+config.add_listener(_apply_config)
+
+
+def _seconds(ms):
+    return "--" if ms is None else f"{ms / 1000:.3f}"
+
+
+def _perf_cell(i):
+    """Label with the best run, and the last result, of perf run i."""
+    return (
+        (lambda: f"{NAMES[i]}  best {_seconds(perf.best[i])}", f"n{i}", "{}"),
+        (lambda: _seconds(perf.results[i]), f"r{i}", "{}"),
+    )
+
+
+def _perf_page():
+    """Live performance timer: status, count-up and a 2 x 3 result grid."""
+    slots = [
+        Slot("status", "top_left", big, 5, s3lcd.BLACK, s3lcd.GREEN),
+        Slot("clock", "top_right", big, 7),
+    ]
+    items = [
+        (perf.poll, "status", "{}"),
+        (lambda: _seconds(perf.elapsed_ms()), "clock", "{}"),
+    ]
+    for i in range(len(NAMES) + 1):
+        x, y = i % 2 * 160, 36 + i // 2 * 44
+        slots.append(Slot(f"n{i}", "top_left", small, 20, ox=x, oy=y))
+        slots.append(
+            Slot(f"r{i}", "top_left", big, 6, s3lcd.YELLOW, ox=x, oy=y + 9)
+        )
+        if i < len(NAMES):
+            items.extend(_perf_cell(i))
+    items.append((SPEED, f"r{len(NAMES)}", "{}"))
+    return Page(
+        "perf",
+        Layout(slots),
+        items,
+        labels=((f"n{len(NAMES)}", "km/h"),),
+        poll_ms=50,
+        enter=perf.enable,
+        leave=perf.disable,
+    )
+
+
+pager = Pager(
+    [
+        Page(
+            "main",
+            dashboard,
+            DASHBOARD_FIELDS + ((SPEED, speedo, None),),
+            ("fuel", "range", "env", "inputs", "voltage", "clock"),
+            background=BACKGROUND,
+        ),
+        table_page(
+            "trip",
+            "Trip",
+            big,
+            (
+                ("Distance", TRIP, "{}km"),
+                ("Speed", SPEED, "{}"),
+                ("Fuel", FUEL, "{}L"),
+                ("Range", RANGE, "{}km"),
+            ),
+            ("fuel", "range"),
+        ),
+        *[trip_page(trip) for trip in trips.TRIPS],
+        histogram_page,
+        _perf_page(),
+        table_page(
+            "diagnostics",
+            "Diagnostics",
+            big,
+            (
+                ("Supply", VOLTAGE, "{}v"),
+                ("Min-max", _supply_range, "{}"),
+                ("Rejects", _rejects, "{}"),
+                ("CPU", lambda: governor.freq // 1_000_000, "{}MHz"),
+            ),
+            ("voltage",),
+        ),
+        table_page(
+            "memory",
+            "Memory",
+            big,
+            (
+                ("Free", lambda: memdiag.free // 1024, "{}K"),
+                ("Largest", lambda: memdiag.largest // 1024, "{}K"),
+                ("Frag", lambda: memdiag.frag, "{}%"),
+                ("Low", lambda: memdiag.low // 1024, "{}K"),
+            ),
+            ("heap_probe",),
+        ),
+        table_page(
+            "environment",
+            "Environment",
+            big,
+            (
+                ("Time", TIME, "{}"),
+                ("Temp", TEMPERATURE, "{}"),
+                ("Humidity", HUMIDITY, "{}%"),
+                ("Supply", VOLTAGE, "{}v"),
+            ),
+            ("env", "clock", "voltage"),
+        ),
+    ],
+    assets,
+)
+
+# the most important alert, over the top row of any page
+banner = Banner(big)
+memdiag.mark("pages")
 
 btn_select = Buttons().left
 btn_next = Buttons().right
@@ -45,61 +313,92 @@ def wait_for_both_pressed(timeout=5000):
     return False
 
 
+def redraw(snapshot):
+    """Draw the current page from scratch, with the alert banner."""
+    pager.show(snapshot)
+    banner.invalidate()
+
+
+def apply_palette(snapshot, night):
+    """Switch every page between the day and the night palette."""
+    assets.release(palette.picture(BACKGROUND))
+    palette.set_night(night)
+    assets.cache(palette.picture(BACKGROUND))
+    pager.resolve()
+    speedo.set_colors(palette.color(s3lcd.BLACK), palette.color(s3lcd.WHITE))
+    redraw(snapshot)
+
+
 def main():
     tft.init()
     tft.fill(s3lcd.BLACK)
-    tft.rotation(3)
+    tft.rotation(ROTATION)
+    pager.resolve()
+    speedo.place(
+        (tft.width() - speedo.width) // 2, tft.height() - speedo.height - 1
+    )
     tft.show()
-    for pos in range(tft.height(), -17, 17):
-        tft.png("pictures/logo.png", 0, pos)
-        tft.show()
-    time.sleep(1)
-    tft.fill(s3lcd.BLACK)
-    tft.png("pictures/background_n.png", 0, 0)
+    if is_cold_boot() and not recovery.restored:
+        play_logo(tft, assets)
+    assets.cache(BACKGROUND)
+    snapshot = Snapshot(state)
+    redraw(snapshot)
     tft.show()
+    scheduler.add_task("brightness", update_brightness, UPDATE_INTERVAL)
+    power.setup(is_stopped, voltage)
+    alerts.setup(get_fuel_level, get_temperature_c, voltage)
+    scheduler.add_task("governor", governor.tick, WINDOW_MS)
+    if telemetry.ENABLED:
+        telemetry.start(get_telemetry)
+    recovery.start()
+    memdiag.mark("display")
+    memdiag.end_boot()
+    if acquisition.USE_THREAD:
+        acquisition.start()
+    else:
+        scheduler.start()
     while True:
-        update_brightness()
+        recovery.alive()
         if wait_for_both_pressed():
             while not btn_select.value() or not btn_next.value():
                 time.sleep_ms(200)
+            governor.boost()
+            recovery.watch_loop(False)  # the menu blocks the loop
             show_menu()
-            tft.png("pictures/background_n.png", 0, 0)
-            tft.show()
-        current_speed = get_speed()
-        current_transmission = get_transmission()
-        markup.center(big, f"{read_time()}")
-        tft.fill_rect(26, 1, 80, big.HEIGHT, s3lcd.YELLOW)
-        tft.fill_rect(144, 4, 32, big.HEIGHT, s3lcd.WHITE)
-        tft.fill_rect(124, 170 - big.HEIGHT, 64, big.HEIGHT, s3lcd.WHITE)
-        markup.top_left(
-            big, f"{get_fuel_level()}L", s3lcd.BLACK, s3lcd.YELLOW, 26, 1
-        )
-        markup.left_center(big, f"{get_trip_km()}")
-        markup.top_right(
-            big, f"{get_voltage()}v", s3lcd.BLACK, s3lcd.GREEN, -40, -1
-        )
-        markup.right_center(big, f"{humidity()}")
-        markup.bottom_right(
-            big, f"{temperature()}", s3lcd.BLACK, s3lcd.CYAN, -27, -1
-        )
-        markup.bottom_left(
-            big,
-            f"{get_remaining_range()}km",
-            s3lcd.BLACK,
-            s3lcd.RED,
-            26,
-            -1,
-        )
-        markup.top_center(
-            big,
-            f"{current_transmission}",
-            s3lcd.BLACK,
-            s3lcd.WHITE,
-            oy=4,
-            ox=0,
-        )
-        markup.bottom_center(big, f"{current_speed}", s3lcd.BLACK, s3lcd.WHITE)
+            recovery.watch_loop(True)
+            redraw(snapshot)
+
+        if power.pending():
+            power.sleep_now(tft, speed_pin, (btn_select, btn_next), ROTATION)
+            governor.boost()
+            pager.resolve()
+            redraw(snapshot)
+
+        if is_night() != palette.night:
+            governor.boost()
+            apply_palette(snapshot, is_night())
+
+        if pager.poll(btn_select, btn_next):
+            governor.boost()  # a full redraw follows every page change
+            redraw(snapshot)
+
+        scheduler.take_busy_us()  # tasks in the last frame are in its time
+        start = time.ticks_us()
+        values = snapshot.take()
+        drew = banner.draw(pager.page, assets)
+        if not pager.page.draw(snapshot, values) and not drew:
+            time.sleep_ms(IDLE_MS)
+            governor.idle(
+                time.ticks_diff(time.ticks_us(), start),
+                scheduler.take_busy_us(),
+            )
+            continue
         tft.show()
+        governor.frame(time.ticks_diff(time.ticks_us(), start))
 
 
-main()
+try:
+    main()
+except KeyboardInterrupt:  # to the REPL: files on flash become current
+    recovery.stop()
+    raise
@@ -0,0 +1,285 @@
+"""Compile PNG pictures into a packed RGB565 asset file for the firmware.
+
+Usage:
+    python tools/asset_compiler.py main/pictures/*.png -o main/pictures/assets.pack
+
+Every picture is decoded on the host, composited over black, converted to
+RGB565 and stored either raw or RLE-compressed (whichever is smaller). All
+assets go into one pack with an offset table, read on the device by
+``functions/assets.py``. ``--dark NAME`` also stores a dimmed copy named
+``NAME_dk`` for the night palette (``functions/palette.py``).
+
+Pack layout (little-endian):
+    header  "<4sHH"         magic b"RGBP", version, asset count
+    entry   "<16sHHBxxxII"  name, width, height, encoding, offset, size
+    data    asset blobs, each starting at its entry offset
+
+RLE stream (per asset, row-major pixels):
+    n < 0x80   -> n + 1 literal pixels follow (2 bytes each)
+    n >= 0x80  -> one pixel follows, repeated n - 0x7D times (3..130)
+"""
+
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"RGBP"
+VERSION = 1
+HEADER = "<4sHH"
+ENTRY = "<16sHHBxxxII"
+ENC_RAW = 0
+ENC_RLE = 1
+
+DARK_SUFFIX = "_dk"
+DARK_LEVEL = 35  # % of day brightness, same as palette.NIGHT_LEVEL
+
+PANEL_WIDTH = 320
+PANEL_HEIGHT = 170
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+# ======================================================
+# PNG decoding
+# ======================================================
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def decode_png(path):
+    """Decode an 8-bit non-interlaced PNG into (width, height, rgb rows)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != _PNG_SIGNATURE:
+        raise ValueError(f"{path}: not a PNG file")
+
+    pos, idat = 8, []
+    width = height = depth = ctype = interlace = None
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        chunk = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, ctype, _, _, interlace = struct.unpack(
+                ">IIBBBBB", chunk
+            )
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        elif kind == b"IEND":
+            break
+
+    if depth != 8 or interlace or ctype not in _CHANNELS:
+        raise ValueError(
+            f"{path}: only 8-bit non-interlaced grey/RGB(A) PNG is supported"
+        )
+
+    bpp = _CHANNELS[ctype]
+    stride = width * bpp
+    raw = zlib.decompress(b"".join(idat))
+    rows, prev = [], bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        ftype = raw[start]
+        line = bytearray(raw[start + 1 : start + 1 + stride])
+        for i in range(stride):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            if ftype == 1:
+                line[i] = (line[i] + a) & 0xFF
+            elif ftype == 2:
+                line[i] = (line[i] + b) & 0xFF
+            elif ftype == 3:
+                line[i] = (line[i] + ((a + b) >> 1)) & 0xFF
+            elif ftype == 4:
+                line[i] = (line[i] + _paeth(a, b, c)) & 0xFF
+        rows.append(_to_rgb(line, ctype))
+        prev = line
+    return width, height, rows
+
+
+def _to_rgb(line, ctype):
+    """Convert one decoded scanline to a list of (r, g, b) over black."""
+    bpp = _CHANNELS[ctype]
+    out = []
+    for i in range(0, len(line), bpp):
+        if ctype in (0, 4):
+            r = g = b = line[i]
+        else:
+            r, g, b = line[i], line[i + 1], line[i + 2]
+        if ctype in (4, 6):
+            alpha = line[i + bpp - 1]
+            r, g, b = (r * alpha // 255, g * alpha // 255, b * alpha // 255)
+        out.append((r, g, b))
+    return out
+
+
+# ======================================================
+# RGB565 conversion and encoding
+# ======================================================
+def to_rgb565(rows, swap=False):
+    """Return the picture as a flat list of RGB565 pixel values."""
+    pixels = []
+    for row in rows:
+        for r, g, b in row:
+            px = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            if swap:
+                px = ((px & 0xFF) << 8) | (px >> 8)
+            pixels.append(px)
+    return pixels
+
+
+def dim(rows, level):
+    """Scale every channel to level percent (night copies of pictures)."""
+    return [
+        [
+            (r * level // 100, g * level // 100, b * level // 100)
+            for r, g, b in row
+        ]
+        for row in rows
+    ]
+
+
+def encode_raw(pixels):
+    return struct.pack(f"<{len(pixels)}H", *pixels)
+
+
+def encode_rle(pixels):
+    """Encode pixels with the literal/repeat scheme described above."""
+    out = bytearray()
+    literal = []
+    i, n = 0, len(pixels)
+
+    def flush():
+        while literal:
+            part = literal[:128]
+            del literal[:128]
+            out.append(len(part) - 1)
+            out.extend(struct.pack(f"<{len(part)}H", *part))
+
+    while i < n:
+        run = 1
+        while i + run < n and run < 130 and pixels[i + run] == pixels[i]:
+            run += 1
+        if run >= 3:
+            flush()
+            out.append(run + 0x7D)
+            out.extend(struct.pack("<H", pixels[i]))
+            i += run
+        else:
+            literal.append(pixels[i])
+            i += 1
+    flush()
+    return bytes(out)
+
+
+# ======================================================
+# Pack writer
+# ======================================================
+def _encode(name, width, height, rows, force_raw, swap):
+    if len(name.encode()) > 16:
+        raise ValueError(f"{name}: asset name longer than 16 bytes")
+    pixels = to_rgb565(rows, swap)
+    blob, enc = encode_raw(pixels), ENC_RAW
+    if not force_raw:
+        rle = encode_rle(pixels)
+        if len(rle) < len(blob):
+            blob, enc = rle, ENC_RLE
+    return name, width, height, enc, blob
+
+
+def compile_assets(
+    paths, output, force_raw=False, swap=False, dark=(), dark_level=DARK_LEVEL
+):
+    """Build the pack file from PNG paths; return a list of summaries.
+
+    Pictures named in dark get an extra NAME_dk copy at dark_level %.
+    """
+    assets = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        width, height, rows = decode_png(path)
+        if width > PANEL_WIDTH or height > PANEL_HEIGHT:
+            raise ValueError(
+                f"{path}: {width}x{height} exceeds the "
+                f"{PANEL_WIDTH}x{PANEL_HEIGHT} panel"
+            )
+        assets.append(_encode(name, width, height, rows, force_raw, swap))
+        if name in dark:
+            rows = dim(rows, dark_level)
+            assets.append(
+                _encode(
+                    name + DARK_SUFFIX, width, height, rows, force_raw, swap
+                )
+            )
+
+    offset = struct.calcsize(HEADER) + len(assets) * struct.calcsize(ENTRY)
+    table, summary = [], []
+    for name, width, height, enc, blob in assets:
+        table.append(
+            struct.pack(
+                ENTRY, name.encode(), width, height, enc, offset, len(blob)
+            )
+        )
+        summary.append((name, width, height, enc, len(blob)))
+        offset += len(blob)
+
+    with open(output, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, len(assets)))
+        f.write(b"".join(table))
+        for asset in assets:
+            f.write(asset[4])
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pictures", nargs="+", help="PNG files to pack")
+    parser.add_argument("-o", "--output", required=True, help="pack file")
+    parser.add_argument(
+        "--raw", action="store_true", help="never RLE-compress assets"
+    )
+    parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="store big-endian RGB565 (panels without byte swapping)",
+    )
+    parser.add_argument(
+        "--dark",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="also pack a dimmed NAME_dk copy for night mode",
+    )
+    parser.add_argument(
+        "--dark-level",
+        type=int,
+        default=DARK_LEVEL,
+        help="brightness of dark copies, percent",
+    )
+    args = parser.parse_args(argv)
+
+    summary = compile_assets(
+        args.pictures,
+        args.output,
+        args.raw,
+        args.swap,
+        args.dark,
+        args.dark_level,
+    )
+    for name, width, height, enc, size in summary:
+        kind = "rle" if enc == ENC_RLE else "raw"
+        print(f"{name:16} {width}x{height} {kind} {size} bytes")
+    print(f"wrote {args.output} ({os.path.getsize(args.output)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Compare frame rates with sensors sampled inline or in a second thread.
+
+Usage:
+    python tools/bench_acquisition.py --seconds 5 --render-ms 8
+
+Sensor tasks are registered on the real timer wheel
+(``functions/scheduler.py``) with waits that model the device: DHT11
+handshake, I2C RTC read, ADC reads. The render side takes a
+``Snapshot`` and spends --render-ms of CPU per frame. Single-threaded
+mode polls the wheel between frames, as main.py does without
+``acquisition.USE_THREAD``; dual mode runs it in
+``functions/acquisition.py``.
+"""
+
+import argparse
+import sys
+import time
+
+import simulator
+
+# name, period ms, wait ms
+SENSOR_TASKS = (
+    ("env", 2000, 25.0),  # DHT11 start signal and 40-bit transfer
+    ("clock", 250, 1.0),  # DS3231 register read over I2C
+    ("inputs", 200, 0.3),  # gear pins and voltage ADC
+    ("fuel", 10000, 0.2),
+    ("trip", 1000, 0.1),
+    ("brightness", 100, 0.2),
+)
+
+
+def _busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def _register(scheduler, state):
+    for field, (name, period, wait) in enumerate(SENSOR_TASKS):
+
+        def task(field=field, wait=wait):
+            time.sleep(wait / 1000)
+            state.publish(field, time.ticks_ms())
+
+        scheduler.add_task(name, task, period)
+
+
+def _run(seconds, render_ms, threaded, scheduler, acquisition, snapshot):
+    if threaded:
+        acquisition.start()
+    frames, worst = 0, 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        if not threaded:
+            scheduler.run_pending()
+        snapshot.take()
+        _busy(render_ms)
+        frames += 1
+        worst = max(worst, time.perf_counter() - start)
+    if threaded:
+        acquisition.stop()
+    return frames / seconds, worst * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--render-ms", type=float, default=8.0, help="CPU time per frame"
+    )
+    args = parser.parse_args(argv)
+
+    simulator.install()
+    from functions import acquisition, scheduler
+    from functions.state import SensorState, Snapshot
+
+    state = SensorState(len(SENSOR_TASKS))
+    _register(scheduler, state)
+    snapshot = Snapshot(state)
+
+    print(f"{'mode':8} {'fps':>8} {'worst frame ms':>16}")
+    for threaded in (False, True):
+        fps, worst = _run(
+            args.seconds,
+            args.render_ms,
+            threaded,
+            scheduler,
+            acquisition,
+            snapshot,
+        )
+        mode = "dual" if threaded else "single"
+        print(f"{mode:8} {fps:8.1f} {worst:16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
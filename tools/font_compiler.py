@@ -0,0 +1,138 @@
+"""Convert an s3lcd bitmap font module into a binary font file.
+
+Usage:
+    python tools/font_compiler.py main/fonts/vga2_bold_16x32.py \\
+        -o main/fonts/vga2_bold_16x32.fnt --printable
+    python tools/font_compiler.py main/fonts/vga2_bold_16x32.py \\
+        -o main/fonts/digits_16x32.fnt --chars "0123456789 .:-"
+
+The file is read lazily on the device by ``functions/binfont.py``.
+
+Layout (little-endian):
+    header  "<4sBBBBH"  magic b"BFNT", version, width, height, flags, count
+    index   "<BIH"      code point, offset, size (sorted by code point)
+    data    glyph bitmaps, 1 bit per pixel, rows padded to whole bytes
+
+With flag bit 0 set, glyph data is RLE-compressed per glyph:
+    n < 0x80   -> n + 1 literal bytes follow
+    n >= 0x80  -> one byte follows, repeated n - 0x7D times (3..130)
+"""
+
+import argparse
+import importlib.util
+import os
+import struct
+import sys
+
+MAGIC = b"BFNT"
+VERSION = 1
+HEADER = "<4sBBBBH"
+INDEX = "<BIH"
+FLAG_RLE = 0x01
+
+PRINTABLE = "".join(chr(c) for c in range(0x20, 0x7F))
+
+
+def load_module(path):
+    """Import a font module from a file path."""
+    spec = importlib.util.spec_from_file_location("font", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def encode_rle(data):
+    """Encode bytes with the literal/repeat scheme described above."""
+    out = bytearray()
+    literal = bytearray()
+    i, n = 0, len(data)
+
+    def flush():
+        while literal:
+            part = literal[:128]
+            del literal[:128]
+            out.append(len(part) - 1)
+            out.extend(part)
+
+    while i < n:
+        run = 1
+        while i + run < n and run < 130 and data[i + run] == data[i]:
+            run += 1
+        if run >= 3:
+            flush()
+            out.append(run + 0x7D)
+            out.append(data[i])
+            i += run
+        else:
+            literal.append(data[i])
+            i += 1
+    flush()
+    return bytes(out)
+
+
+def compile_font(module, output, chars=None, rle=True):
+    """Write a binary font; return (glyph count, file size)."""
+    glyph_size = ((module.WIDTH + 7) // 8) * module.HEIGHT
+    first, last = module.FIRST, module.LAST
+    codes = sorted(
+        {ord(c) for c in chars} if chars else range(first, last + 1)
+    )
+    codes = [c for c in codes if first <= c <= last]
+
+    glyphs = []
+    for code in codes:
+        start = (code - first) * glyph_size
+        bits = bytes(module._FONT[start : start + glyph_size])
+        glyphs.append((code, encode_rle(bits) if rle else bits))
+
+    offset = struct.calcsize(HEADER) + len(glyphs) * struct.calcsize(INDEX)
+    index = []
+    for code, blob in glyphs:
+        index.append(struct.pack(INDEX, code, offset, len(blob)))
+        offset += len(blob)
+
+    flags = FLAG_RLE if rle else 0
+    with open(output, "wb") as f:
+        f.write(
+            struct.pack(
+                HEADER,
+                MAGIC,
+                VERSION,
+                module.WIDTH,
+                module.HEIGHT,
+                flags,
+                len(glyphs),
+            )
+        )
+        f.write(b"".join(index))
+        for _, blob in glyphs:
+            f.write(blob)
+    return len(glyphs), os.path.getsize(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("font", help="font module (.py)")
+    parser.add_argument("-o", "--output", required=True, help="font file")
+    subset = parser.add_mutually_exclusive_group()
+    subset.add_argument("--chars", help="only include these characters")
+    subset.add_argument(
+        "--printable",
+        action="store_true",
+        help="only include printable ASCII (0x20-0x7e)",
+    )
+    parser.add_argument(
+        "--no-rle", action="store_true", help="store glyphs uncompressed"
+    )
+    args = parser.parse_args(argv)
+
+    chars = PRINTABLE if args.printable else args.chars
+    count, size = compile_font(
+        load_module(args.font), args.output, chars, not args.no_rle
+    )
+    print(f"wrote {args.output}: {count} glyphs, {size} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Replay load traces through the CPU frequency governor.
+
+Usage:
+    python tools/governor_sim.py                  # built-in demo traces
+    python tools/governor_sim.py ride.csv --timeline
+
+A trace is a CSV file with one row per governor window
+(``WINDOW_MS`` in ``functions/governor.py``)::
+
+    frames,frame_ms,task_ms[,input]
+
+frames drawn in the window, CPU time per frame and scheduler task time
+in the window's idle sleeps, all measured at 240 MHz, and 1 when a
+button press starts the window; tasks that run inside a frame belong
+to frame_ms. The simulator scales the work to the clock the governor
+picked, feeds it the same frame, sleep and task figures main.py does,
+boosts on input like main.py and reports the time spent at each step,
+missed frame targets and an estimate of the average current.
+"""
+
+import argparse
+import csv
+import sys
+
+import simulator
+
+# rough ESP32-S3 active current per CPU clock, mA; edit for your board
+CURRENT_MA = {80_000_000: 22, 160_000_000: 30, 240_000_000: 40}
+BASE_HZ = 240_000_000
+
+
+def _demo_traces():
+    """Parked, riding, logging and menu-heavy traces, 120 windows each."""
+    parked = [(1, 4.0, 3.0, 0)] * 120  # clock only, one field per second
+    riding = [(10, 6.0, 4.0, 0)] * 120  # speed and trip change constantly
+    logging = [(10, 6.0, 70.0, 0)] * 120  # riding, busy acquisition tasks
+    menu = (  # riding, a page change and full redraws every 20 windows
+        [(10, 6.0, 4.0, 0)] * 16
+        + [(12, 30.0, 4.0, 1)]
+        + [(12, 30.0, 4.0, 0)] * 3
+    ) * 6
+    return {
+        "parked": parked,
+        "riding": riding,
+        "logging": logging,
+        "menu": menu,
+    }
+
+
+def _load(path):
+    with open(path, newline="") as f:
+        rows = [r for r in csv.reader(f) if r and not r[0].startswith("#")]
+    if rows and not rows[0][0].strip().isdigit():
+        rows = rows[1:]  # header
+    return [
+        (int(r[0]), float(r[1]), float(r[2]), int(r[3]) if r[3:] else 0)
+        for r in rows
+    ]
+
+
+def simulate(trace, governor_mod):
+    """Run one trace and return (per-window freqs, missed frames)."""
+    freqs = []
+    gov = governor_mod.Governor(set_freq=lambda hz: None)
+    window_us = governor_mod.WINDOW_MS * 1000
+    missed = 0
+    for frames, frame_ms, task_ms, pressed in trace:
+        if pressed:
+            gov.boost()
+        freqs.append(gov.freq)
+        used = 0
+        for _ in range(frames):
+            frame_us = int(frame_ms * 1000 * BASE_HZ / gov.freq)
+            used += frame_us
+            if frame_us > governor_mod.TARGET_FRAME_US:
+                missed += 1
+            gov.frame(frame_us)
+        task_us = int(task_ms * 1000 * BASE_HZ / gov.freq)
+        gov.idle(max(0, window_us - used), task_us)
+        gov.update()
+    return freqs, missed
+
+
+def _report(name, freqs, missed, timeline):
+    n = len(freqs)
+    shares = " ".join(
+        f"{hz // 1_000_000}MHz {freqs.count(hz) * 100 // n:3d}%"
+        for hz in sorted(CURRENT_MA)
+    )
+    avg_ma = sum(CURRENT_MA[hz] for hz in freqs) / n
+    saving = 100 - avg_ma * 100 / CURRENT_MA[BASE_HZ]
+    print(
+        f"{name:10} {shares}  missed {missed:4d}  "
+        f"{avg_ma:5.1f} mA ({saving:.0f}% below 240 MHz)"
+    )
+    if timeline:
+        print("  " + "".join(str(hz // 80_000_000) for hz in freqs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("traces", nargs="*", help="CSV load traces")
+    parser.add_argument(
+        "--timeline",
+        action="store_true",
+        help="print the step per window (1=80, 2=160, 3=240 MHz)",
+    )
+    args = parser.parse_args(argv)
+
+    simulator.install()
+    from functions import governor
+
+    if args.traces:
+        traces = {path: _load(path) for path in args.traces}
+    else:
+        traces = _demo_traces()
+    for name, trace in traces.items():
+        freqs, missed = simulate(trace, governor)
+        _report(name, freqs, missed, args.timeline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Print the time-in-gear and speed-band histograms.
+
+Usage:
+    python tools/histogram_dump.py histograms.bin
+    python tools/histogram_dump.py /dev/ttyACM0 --csv ride.csv
+
+The board keeps the counters in ``/histograms.bin``
+(``functions/histograms.py``) and rewrites it with every trip save. The
+source is either a copy of that file or a serial port to fetch it from
+with ``tools/transfer.py``. The file is read by the firmware module
+itself, so the tool follows any change to its layout.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+import simulator
+
+simulator.install()
+from functions import histograms  # noqa: E402
+
+REMOTE = "/histograms.bin"
+
+
+def fetch(port, baud):
+    """Download the counters file from the board; return the local path."""
+    import serial
+    import transfer
+
+    local = os.path.join(tempfile.mkdtemp(), "histograms.bin")
+    with serial.Serial(port, baud, timeout=0.05) as p:
+        client = transfer.Client(p)
+        client.enter()
+        try:
+            client.get(REMOTE, local)
+        finally:
+            client.leave()
+    return local
+
+
+def _hms(seconds):
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _bar(value, top, width=30):
+    return "#" * round(width * value / top) if top else ""
+
+
+def rows():
+    """Yield (kind, bin, seconds, metres) for every counter."""
+    for i, gear in enumerate(histograms.GEARS):
+        yield "gear", str(gear), histograms.gear_s[i], histograms.gear_m[i]
+    for i in range(histograms.BANDS):
+        yield "band", histograms.band_label(i), histograms.band_s[i], ""
+
+
+def report():
+    gear_total = sum(histograms.gear_s) or 1
+    band_total = sum(histograms.band_s) or 1
+    top = max(histograms.gear_s)
+    print("gear      time  share       km  avg km/h")
+    for i, gear in enumerate(histograms.GEARS):
+        s, m = histograms.gear_s[i], histograms.gear_m[i]
+        avg = m * 3.6 / s if s else 0
+        print(
+            f"{gear!s:>4} {_hms(s):>9} {100 * s / gear_total:5.1f}% "
+            f"{m / 1000:8.1f} {avg:9.1f}  {_bar(s, top)}"
+        )
+    top = max(histograms.band_s)
+    print("\nkm/h      time  share")
+    for i in range(histograms.BANDS):
+        s = histograms.band_s[i]
+        print(
+            f"{histograms.band_label(i):>4} {_hms(s):>9} "
+            f"{100 * s / band_total:5.1f}%  {_bar(s, top)}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="histograms.bin or a serial port")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--csv", help="also write the counters to this file")
+    args = parser.parse_args(argv)
+
+    path = args.source
+    if not os.path.isfile(path):
+        path = fetch(path, args.baud)
+    histograms.HIST_FILE = path
+    histograms.load()
+    if not sum(histograms.gear_s):
+        print(f"{path}: no data (empty or from another firmware version)")
+        return 1
+    report()
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("kind", "bin", "seconds", "metres"))
+            writer.writerows(rows())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
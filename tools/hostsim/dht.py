@@ -0,0 +1,22 @@
+"""Host stand-in for the MicroPython ``dht`` module."""
+
+
+class DHT11:
+    def __init__(self, pin):
+        self.pin = pin
+        self._temperature = 20
+        self._humidity = 50
+
+    def set(self, temperature, humidity):
+        """Host only: choose the next reading."""
+        self._temperature = temperature
+        self._humidity = humidity
+
+    def measure(self):
+        pass
+
+    def temperature(self):
+        return self._temperature
+
+    def humidity(self):
+        return self._humidity
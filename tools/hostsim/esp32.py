@@ -0,0 +1,69 @@
+"""Host stand-in for the MicroPython ``esp32`` module."""
+
+WAKEUP_ALL_LOW = 0
+WAKEUP_ANY_HIGH = 1
+
+wake_sources = {}
+
+
+def wake_on_ext0(pin, level):
+    wake_sources["ext0"] = (pin, level)
+
+
+def wake_on_ext1(pins, level):
+    wake_sources["ext1"] = (pins, level)
+
+
+class PCNT:
+    """Pulse counter unit counting rising edges of a hostsim Pin.
+
+    Like the hardware, the 16-bit counter resets to zero when it reaches
+    ``max`` and fires the IRQ_MAX handler.
+    """
+
+    INCREMENT = 1
+    IRQ_MAX = 0x04
+
+    def __init__(
+        self, id, pin=None, rising=0, filter=0, min=-32768, max=32767
+    ):
+        self.id = id
+        self._max = max
+        self._value = 0
+        self._running = False
+        self._handler = None
+        self._flags = 0
+        if rising == PCNT.INCREMENT:
+            pin.add_listener(self._edge)
+
+    def _edge(self):
+        if not self._running:
+            return
+        self._value += 1
+        if self._value >= self._max:
+            self._value = 0
+            if self._handler:
+                self._flags = PCNT.IRQ_MAX
+                self._handler(self)
+
+    def irq(self, handler=None, trigger=IRQ_MAX):
+        self._handler = handler
+        return self
+
+    def flags(self):
+        return self._flags
+
+    def start(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def value(self, value=None):
+        current = self._value
+        if value is not None:
+            self._value = value
+        return current
+
+    def deinit(self):
+        self._running = False
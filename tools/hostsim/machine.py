@@ -0,0 +1,203 @@
+"""Host stand-in for the MicroPython ``machine`` module.
+
+Only the parts the firmware uses are modelled. Inputs are driven from
+host code (``Pin.pulse()``, ``ADC.set()``) so firmware modules can run
+unchanged on a PC.
+"""
+
+import threading
+import time
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+_freq = 240_000_000
+_reset_cause = PWRON_RESET
+
+
+def freq(hz=None):
+    global _freq
+    if hz is None:
+        return _freq
+    _freq = hz
+
+
+def reset_cause():
+    return _reset_cause
+
+
+def set_reset_cause(cause):
+    """Host only: choose what reset_cause() reports."""
+    global _reset_cause
+    _reset_cause = cause
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 2
+    PULL_DOWN = 3
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self._value = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self._value = value
+        self._handler = None
+        self._trigger = 0
+        self._listeners = []
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        rising = not self._value and v
+        falling = self._value and not v
+        self._value = 1 if v else 0
+        if rising:
+            for listener in self._listeners:
+                listener()
+        if self._handler and (
+            (rising and self._trigger & Pin.IRQ_RISING)
+            or (falling and self._trigger & Pin.IRQ_FALLING)
+        ):
+            self._handler(self)
+
+    def irq(self, handler=None, trigger=IRQ_RISING, wake=None, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+
+    def pulse(self, count=1):
+        """Host only: generate rising edges."""
+        for _ in range(count):
+            self.value(1)
+            self.value(0)
+
+    def add_listener(self, fn):
+        """Host only: let peripherals (PCNT) watch rising edges."""
+        self._listeners.append(fn)
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+        self.fed = 0
+
+    def feed(self):
+        self.fed += 1
+
+
+class RTC:
+    """Only the user memory, kept across "resets" of the host process."""
+
+    _memory = b""
+
+    def memory(self, data=None):
+        if data is None:
+            return RTC._memory
+        RTC._memory = bytes(data)
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_11DB = 3
+
+    def __init__(self, pin, atten=None):
+        self.pin = pin
+        self._raw = 0
+
+    def atten(self, value):
+        pass
+
+    def set(self, raw):
+        """Host only: set the 12-bit reading returned by read()."""
+        self._raw = max(0, min(4095, int(raw)))
+
+    def read(self):
+        return self._raw
+
+    def read_u16(self):
+        return self._raw << 4
+
+    def read_uv(self):
+        return self._raw * 3_100_000 // 4095
+
+
+class PWM:
+    def __init__(self, pin, freq=None, duty=None):
+        self.pin = pin
+        self._freq = freq or 1000
+        self._duty = duty or 0
+
+    def freq(self, hz=None):
+        if hz is None:
+            return self._freq
+        self._freq = hz
+
+    def duty(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+
+    def deinit(self):
+        pass
+
+
+class I2C:
+    def __init__(self, id, scl=None, sda=None, freq=400_000):
+        self._mem = {}
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(self._mem.get((addr, reg + i), 0) for i in range(n))
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        buf[:] = self.readfrom_mem(addr, reg, len(buf))
+
+    def writeto_mem(self, addr, reg, buf):
+        for i, b in enumerate(buf):
+            self._mem[(addr, reg + i)] = b
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1):
+        self.id = id
+        self._thread = None
+        self._stop = None
+
+    def init(self, period=1000, mode=PERIODIC, callback=None):
+        self.deinit()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(period / 1000):
+                callback(self)
+                if mode == Timer.ONE_SHOT:
+                    break
+
+        self._stop = stop
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def deinit(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+def idle():
+    time.sleep(0)
+
+
+def lightsleep(ms=None):
+    """Host: return immediately as if a wake source fired."""
+
+
+def deepsleep(ms=None):
+    raise SystemExit("deepsleep")
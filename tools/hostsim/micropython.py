@@ -0,0 +1,23 @@
+"""Host stand-in for the MicroPython ``micropython`` module."""
+
+
+def const(value):
+    return value
+
+
+def native(fn):
+    """The host runs the bytecode version of native functions."""
+    return fn
+
+
+def schedule(fn, arg):
+    """Run fn(arg) right away; the host has no IRQ context to leave."""
+    fn(arg)
+
+
+def kbd_intr(chr):
+    pass
+
+
+def mem_info(verbose=False):
+    pass
@@ -0,0 +1,60 @@
+"""Host stand-in for the ``s3lcd`` display driver.
+
+Drawing calls are accepted and dropped; only the geometry is modelled,
+so modules that draw can be imported and exercised without a screen.
+"""
+
+BLACK = 0x0000
+BLUE = 0x001F
+RED = 0xF800
+GREEN = 0x07E0
+CYAN = 0x07FF
+MAGENTA = 0xF81F
+YELLOW = 0xFFE0
+WHITE = 0xFFFF
+
+RGB = 0
+BGR = 1
+
+
+class I80_BUS:
+    def __init__(self, data, **kwargs):
+        self.data = data
+
+
+class ESPLCD:
+    def __init__(self, bus, width, height, rotation=0, **kwargs):
+        self._size = (width, height)
+        self._rotation = rotation
+
+    def init(self):
+        pass
+
+    def deinit(self):
+        pass
+
+    def rotation(self, r=None):
+        if r is None:
+            return self._rotation
+        self._rotation = r
+
+    def width(self):
+        return self._size[self._rotation & 1 ^ 1]
+
+    def height(self):
+        return self._size[self._rotation & 1]
+
+    def fill(self, color):
+        pass
+
+    def fill_rect(self, x, y, w, h, color):
+        pass
+
+    def blit_buffer(self, buf, x, y, w, h):
+        pass
+
+    def text(self, font, text, x, y, fc=WHITE, bc=BLACK):
+        pass
+
+    def show(self):
+        pass
@@ -0,0 +1,3 @@
+"""Host stand-in for the MicroPython ``ujson`` module."""
+
+from json import dump, dumps, load, loads  # noqa: F401
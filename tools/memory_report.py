@@ -0,0 +1,125 @@
+"""Print the heap report of the firmware, or measure it on the host.
+
+Usage:
+    python tools/memory_report.py sim --save memory_base.json
+    python tools/memory_report.py sim --baseline memory_base.json
+    python tools/memory_report.py /dev/ttyACM0
+    python tools/memory_report.py memory.json
+
+The board records what each module import keeps on the heap while it
+boots, then the free heap, the largest free block and the minimum free
+watermarks (``functions/memdiag.py``), and writes them to
+``/memory.json``. The source is a copy of that file, a serial port to
+fetch it from with ``tools/transfer.py``, or ``sim``: import the
+firmware modules here through the same tracing, with the heap measured
+by tracemalloc. Host bytes are CPython bytes; compare a simulated run
+with a simulated baseline to catch a module that grew before flashing.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import simulator
+
+simulator.install()
+from functions import memdiag  # noqa: E402
+
+REMOTE = "/memory.json"
+MIN_GROWTH = 512  # bytes; smaller changes are noise
+
+
+def fetch(port, baud):
+    """Download the report from the board; return the local path."""
+    import serial
+    import transfer
+
+    local = os.path.join(tempfile.mkdtemp(), "memory.json")
+    with serial.Serial(port, baud, timeout=0.05) as p:
+        client = transfer.Client(p)
+        client.enter()
+        try:
+            client.get(REMOTE, local)
+        finally:
+            client.leave()
+    return local
+
+
+def simulate():
+    """Import every firmware module under memdiag tracing."""
+    simulator.install_heap()
+    folder = os.path.join(simulator.FIRMWARE, "functions")
+    cwd = os.getcwd()
+    os.chdir(simulator.FIRMWARE)  # fonts load relative to it, as on the board
+    memdiag.trace_imports()
+    skipped = []
+    try:
+        for name in sorted(os.listdir(folder)):
+            module, ext = os.path.splitext(name)
+            if ext != ".py" or module == "__init__":
+                continue
+            try:
+                __import__("functions." + module)
+            except ImportError as e:
+                skipped.append(f"{module} ({e.name})")
+    finally:
+        memdiag.stop_tracing()
+        os.chdir(cwd)
+    memdiag.probe()
+    return skipped
+
+
+def compare(baseline, tolerance):
+    """Return the lines of modules that grew beyond tolerance percent."""
+    with open(baseline) as f:
+        before = {r[0]: r[2] for r in json.load(f)["boot"]}
+    worse = []
+    for name, _, kept, _ in memdiag.boot:
+        old = before.get(name)
+        if old is None:
+            continue
+        if kept - old > max(MIN_GROWTH, old * tolerance / 100):
+            worse.append(f"{name}: {old} -> {kept} B")
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "source", help="memory.json, a serial port, or sim for the host"
+    )
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--save", help="write the report to this file")
+    parser.add_argument("--baseline", help="fail if a module grew since")
+    parser.add_argument(
+        "--tolerance", type=float, default=10, help="allowed growth, %%"
+    )
+    args = parser.parse_args(argv)
+
+    skipped = []
+    if args.source == "sim":
+        skipped = simulate()
+    else:
+        path = args.source
+        if not os.path.isfile(path):
+            path = fetch(path, args.baud)
+        memdiag.REPORT_FILE = path
+        memdiag.load()
+    memdiag.print_report()
+    if skipped:
+        print("not importable on the host:", ", ".join(skipped))
+    if args.save:
+        memdiag.REPORT_FILE = args.save
+        memdiag.save()
+    if args.baseline:
+        worse = compare(args.baseline, args.tolerance)
+        for line in worse:
+            print("grew:", line)
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Run firmware modules on the host against the stand-ins in tools/hostsim.
+
+Usage:
+    python tools/simulator.py pulses --backend pcnt --rate 4000
+
+install() puts ``tools/hostsim`` and ``main`` on sys.path and adds the
+MicroPython ``time.ticks_*``/``sleep_ms`` helpers, after which modules
+from ``main/functions`` import unchanged. Other host tools call it
+before importing firmware code; install_heap() adds the ``gc`` heap
+figures.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOSTSIM = os.path.join(ROOT, "tools", "hostsim")
+FIRMWARE = os.path.join(ROOT, "main")
+HEAP_SIZE = 8 * 1024 * 1024  # PSRAM heap of the T-Display-S3
+
+_TICKS_PERIOD = 1 << 30
+_start = time.perf_counter_ns()
+
+
+def _ticks(div):
+    return ((time.perf_counter_ns() - _start) // div) % _TICKS_PERIOD
+
+
+def _ticks_diff(a, b):
+    return ((a - b + _TICKS_PERIOD // 2) % _TICKS_PERIOD) - _TICKS_PERIOD // 2
+
+
+def install():
+    """Make firmware modules importable on the host."""
+    for path in (FIRMWARE, HOSTSIM):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    time.ticks_ms = lambda: _ticks(1_000_000)
+    time.ticks_us = lambda: _ticks(1_000)
+    time.ticks_diff = _ticks_diff
+    time.ticks_add = lambda t, d: (t + d) % _TICKS_PERIOD
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1_000_000)
+
+
+def install_heap(size=HEAP_SIZE):
+    """Add ``gc.mem_free``/``mem_alloc`` backed by tracemalloc.
+
+    The heap is size bytes and holds what Python allocated since this
+    call. CPython objects are bigger than MicroPython ones, so compare
+    host figures with each other, not with the board.
+    """
+    tracemalloc.start()
+    gc.mem_alloc = lambda: tracemalloc.get_traced_memory()[0]
+    gc.mem_free = lambda: max(0, size - gc.mem_alloc())
+
+
+# ======================================================
+# Scenarios
+# ======================================================
+def run_pulses(args):
+    """Feed wheel pulses into a counter backend and print per-tick counts."""
+    import functions.pulse_counter as pc
+    from machine import Pin
+
+    pin = Pin(17, Pin.IN)
+    if args.backend == "pcnt":
+        counter = pc.PcntCounter(pin)
+    else:
+        counter = pc.IrqCounter(pin)
+
+    total = 0
+    for tick in range(args.ticks):
+        pin.pulse(args.rate)
+        n = counter.take()
+        total += n
+        print(f"tick {tick}: {n} pulses")
+    expected = args.rate * args.ticks
+    print(f"{type(counter).__name__}: {total}/{expected} pulses counted")
+    return 0 if total == expected else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    p = sub.add_parser("pulses", help=run_pulses.__doc__)
+    p.add_argument("--backend", choices=("irq", "pcnt"), default="pcnt")
+    p.add_argument("--rate", type=int, default=1000, help="pulses per tick")
+    p.add_argument("--ticks", type=int, default=5)
+    p.set_defaults(run=run_pulses)
+
+    args = parser.parse_args(argv)
+    install()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
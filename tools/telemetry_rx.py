@@ -0,0 +1,248 @@
+"""Receive the binary telemetry stream and record or plot it.
+
+Usage:
+    python tools/telemetry_rx.py /dev/ttyACM0 --seconds 60 -o ride.npz
+    python tools/telemetry_rx.py /dev/ttyACM0 --plot
+    python tools/telemetry_rx.py loopback --rate 50 --seconds 5
+
+The device streams frames from ``functions/telemetry.py`` (set
+``ENABLED`` or call ``telemetry.start(get_telemetry)`` from the REPL).
+Frames are found by their sync word and checked with the CRC, so REPL
+output mixed into the stream is skipped. Good frames are decoded in one
+go into a NumPy structured array and saved as .npz or .csv.
+
+``loopback`` runs the firmware encoder on the host, writing into one end
+of a pseudo-terminal pair while this receiver reads the other end, and
+reports the achieved rate and any lost or corrupt frames.
+"""
+
+import argparse
+import binascii
+import os
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+import serial
+
+import simulator
+
+simulator.install()
+from functions import scheduler, telemetry  # noqa: E402
+
+SYNC_BYTES = struct.pack("<H", telemetry.SYNC)
+
+# field names and NumPy types in the order of telemetry.FRAME
+DTYPE = np.dtype(
+    [
+        ("sync", "<u2"),
+        ("seq", "<u2"),
+        ("ms", "<u4"),
+        ("speed", "<u2"),
+        ("trip", "<u4"),
+        ("fuel", "<u2"),
+        ("range", "<u2"),
+        ("mv", "<u2"),
+        ("temperature", "<i2"),
+        ("humidity", "u1"),
+        ("gear", "u1"),
+        ("flags", "u1"),
+        ("crc", "<u2"),
+    ]
+)
+assert DTYPE.itemsize == telemetry.FRAME_SIZE
+
+
+class Decoder:
+    """Split a byte stream into CRC-checked frames."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.frames = bytearray()  # good frames, back to back
+        self.count = 0
+        self.bad = 0
+        self.lost = 0
+        self._seq = None
+
+    def feed(self, data):
+        buf = self._buf
+        buf += data
+        size = telemetry.FRAME_SIZE
+        while True:
+            start = buf.find(SYNC_BYTES)
+            if start < 0:
+                del buf[: max(0, len(buf) - 1)]
+                return
+            if len(buf) - start < size:
+                del buf[:start]
+                return
+            frame = buf[start : start + size]
+            crc = struct.unpack_from("<H", frame, size - 2)[0]
+            if binascii.crc_hqx(bytes(frame[2:-2]), 0xFFFF) != crc:
+                self.bad += 1
+                del buf[: start + 1]
+                continue
+            seq = struct.unpack_from("<H", frame, 2)[0]
+            if self._seq is not None:
+                self.lost += (seq - self._seq - 1) & 0xFFFF
+            self._seq = seq
+            self.frames += frame
+            self.count += 1
+            del buf[: start + size]
+
+    def array(self):
+        """Return the good frames as a structured array."""
+        return np.frombuffer(bytes(self.frames), dtype=DTYPE)
+
+
+def to_units(frames):
+    """Return a dict of float arrays in display units; missing -> NaN."""
+    out = {"t": (frames["ms"] - frames["ms"][0]) / 1000.0}
+    for name, scale, missing in (
+        ("speed", 10, telemetry.MISSING),
+        ("trip", 1000, None),
+        ("fuel", 10, telemetry.MISSING),
+        ("range", 1, telemetry.MISSING),
+        ("mv", 1000, telemetry.MISSING),
+        ("temperature", 10, telemetry.MISSING_TEMP),
+        ("humidity", 1, telemetry.MISSING_BYTE),
+    ):
+        values = frames[name].astype(float) / scale
+        if missing is not None:
+            values[frames[name] == missing] = np.nan
+        out[name] = values
+    out["gear"] = frames["gear"].copy()
+    out["flags"] = frames["flags"].copy()
+    return out
+
+
+def receive(port, seconds, decoder, progress=True):
+    """Read from an open serial port into decoder for seconds."""
+    now = time.monotonic()
+    end, shown = now + seconds, now
+    while now < end:
+        data = port.read(max(1, port.in_waiting))
+        if data:
+            decoder.feed(data)
+        now = time.monotonic()
+        if progress and now - shown > 0.5:
+            shown = now
+            print(
+                f"\r{decoder.count} frames, {decoder.bad} bad, "
+                f"{decoder.lost} lost",
+                end="",
+                file=sys.stderr,
+            )
+    if progress:
+        print(file=sys.stderr)
+
+
+def save(path, units):
+    if path.endswith(".csv"):
+        names = list(units)
+        table = np.column_stack([units[n] for n in names])
+        np.savetxt(path, table, delimiter=",", header=",".join(names))
+    else:
+        np.savez_compressed(path, **units)
+
+
+def plot(units):
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("--plot needs matplotlib (pip install matplotlib)")
+        return
+    rows = ("speed", "mv", "fuel", "temperature")
+    fig, axes = plt.subplots(len(rows), 1, sharex=True)
+    for ax, name in zip(axes, rows):
+        ax.plot(units["t"], units[name])
+        ax.set_ylabel(name)
+    axes[-1].set_xlabel("s")
+    plt.show()
+
+
+def _fake_values():
+    """Changing values for loopback runs, in getter units."""
+    t = time.monotonic()
+    speed = 60 + 40 * np.sin(t / 3)
+    return (
+        float(speed),
+        t * speed / 3600,
+        12.5,
+        250,
+        13800 + int(200 * np.sin(t)),
+        21.5,
+        40,
+        4,
+        0,
+    )
+
+
+def loopback(rate, seconds):
+    """Stream firmware frames through a pty pair and check them."""
+    master, slave = os.openpty()
+    port = serial.Serial(os.ttyname(slave), timeout=0.05)
+    os.close(slave)
+    device = os.fdopen(master, "wb", buffering=0)
+
+    telemetry.start(_fake_values, rate, stream=device)
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            scheduler.run_pending()
+            time.sleep(0.001)
+
+    threading.Thread(target=run, daemon=True).start()
+    decoder = Decoder()
+    receive(port, seconds, decoder)
+    stop.set()
+    telemetry.stop()
+
+    frames = decoder.array()
+    if len(frames) > 1:
+        span = (int(frames["ms"][-1]) - int(frames["ms"][0])) / 1000
+        achieved = (len(frames) - 1) / span
+    else:
+        achieved = 0.0
+    print(
+        f"sent {telemetry.sent}, received {decoder.count} "
+        f"({achieved:.1f} Hz), bad {decoder.bad}, lost {decoder.lost}"
+    )
+    ok = decoder.count and not decoder.bad and not decoder.lost
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("port", help="serial port, or 'loopback'")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=50, help="loopback Hz")
+    parser.add_argument("-o", "--output", help=".npz or .csv file")
+    parser.add_argument("--plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.port == "loopback":
+        return loopback(args.rate, args.seconds)
+
+    decoder = Decoder()
+    with serial.Serial(args.port, args.baud, timeout=0.05) as port:
+        receive(port, args.seconds, decoder)
+    frames = decoder.array()
+    if not len(frames):
+        print("no frames received")
+        return 1
+    units = to_units(frames)
+    if args.output:
+        save(args.output, units)
+        print(f"wrote {len(frames)} frames to {args.output}")
+    if args.plot:
+        plot(units)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""Copy files to and from the board over USB serial.
+
+Usage:
+    python tools/transfer.py /dev/ttyACM0 ls /
+    python tools/transfer.py /dev/ttyACM0 get /trip.json
+    python tools/transfer.py /dev/ttyACM0 put fuel_calib.json /fuel_calib.json
+    python tools/transfer.py sim --root /tmp/board
+    python tools/transfer.py selftest --size 2000000 --corrupt 50
+
+The client interrupts main.py, starts ``functions/transfer.py`` through
+the raw REPL and soft-resets the board when done (``--no-reset`` keeps
+it at the REPL). Files move in CRC-checked 4 KB packets with a sliding
+window. An interrupted ``get`` continues from the local partial file
+after comparing checksums; an interrupted ``put`` continues the remote
+``.part`` file the same way.
+
+``sim`` serves a host directory on a pseudo-terminal as if it were the
+board (use the printed port with ``--no-repl``); ``selftest`` runs a
+put/get round trip against it, optionally damaging one packet in N.
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tty
+import zlib
+
+import serial
+
+import simulator
+
+simulator.install()
+from functions import transfer as proto  # noqa: E402
+
+BAD = proto.BAD
+MAX_LENGTH = 0xFFFFFFFF
+
+
+class TransferError(Exception):
+    pass
+
+
+class Client:
+    """Host side of the transfer protocol on an open serial port."""
+
+    def __init__(self, port, timeout=proto.TIMEOUT_MS / 1000):
+        self.port = port
+        self.timeout = timeout
+        self._rx = bytearray()
+
+    # --------------------------
+    # Session
+    # --------------------------
+    def enter(self):
+        """Stop main.py and start the service through the raw REPL."""
+        port = self.port
+        port.write(b"\r\x03\x03")
+        time.sleep(0.2)
+        port.reset_input_buffer()
+        port.write(b"\x01")
+        if not port.read_until(b"raw REPL; CTRL-B to exit\r\n>"):
+            raise TransferError("no raw REPL")
+        port.write(b"from functions import transfer\ntransfer.serve()\n\x04")
+        if port.read(2) != b"OK":
+            raise TransferError("raw REPL did not accept the command")
+
+    def leave(self, reset=True):
+        self.send(proto.BYE)
+        self.recv()
+        self.port.write(b"\x02")
+        if reset:
+            self.port.write(b"\x04")
+
+    # --------------------------
+    # Packets
+    # --------------------------
+    def send(self, ptype, arg=0, payload=b""):
+        body = struct.pack(proto.HEADER, proto.MAGIC, ptype, len(payload), arg)
+        body += payload
+        self.port.write(body + struct.pack("<I", zlib.crc32(body)))
+
+    def recv(self, timeout=None):
+        """Return (type, arg, payload), None on timeout, BAD on damage."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        rx = self._rx
+        while True:
+            start = rx.find(bytes((proto.MAGIC,)))
+            if start < 0:
+                rx.clear()
+            elif len(rx) - start >= proto.HEADER_SIZE:
+                _, ptype, n, arg = struct.unpack_from(proto.HEADER, rx, start)
+                end = start + proto.HEADER_SIZE + n
+                if n > proto.CHUNK:
+                    del rx[: start + 1]
+                    return BAD
+                if len(rx) >= end + 4:
+                    crc = struct.unpack_from("<I", rx, end)[0]
+                    if zlib.crc32(rx[start:end]) != crc:
+                        del rx[: start + 1]
+                        return BAD
+                    payload = bytes(rx[start + proto.HEADER_SIZE : end])
+                    del rx[: end + 4]
+                    return ptype, arg, payload
+            if time.monotonic() > deadline:
+                return None
+            rx += self.port.read(max(1, self.port.in_waiting))
+
+    def request(self, ptype, arg=0, payload=b""):
+        """Send a request and return the OK reply as (arg, payload)."""
+        self.send(ptype, arg, payload)
+        reply = self.recv()
+        if reply is None or reply is BAD:
+            raise TransferError("no reply")
+        rtype, rarg, rpayload = reply
+        if rtype == proto.ERR:
+            raise TransferError(rpayload.decode())
+        return rarg, rpayload
+
+    # --------------------------
+    # Commands
+    # --------------------------
+    def ls(self, path):
+        self.send(proto.LIST, 0, path.encode())
+        entries = []
+        while True:
+            reply = self.recv()
+            if reply is None or reply is BAD:
+                raise TransferError("listing interrupted")
+            ptype, arg, payload = reply
+            if ptype == proto.ERR:
+                raise TransferError(payload.decode())
+            if ptype == proto.END:
+                return entries
+            entries.append((payload.decode(), arg))
+
+    def checksum(self, path, length=MAX_LENGTH):
+        """Return (crc32, length) of the first length bytes of path."""
+        crc, payload = self.request(proto.SUM, length, path.encode())
+        return crc, struct.unpack("<I", payload)[0]
+
+    def rm(self, path):
+        self.request(proto.RM, 0, path.encode())
+
+    def get(self, remote, local, progress=None):
+        """Download remote into local, resuming a partial local file."""
+        offset = os.path.getsize(local) if os.path.exists(local) else 0
+        if offset:
+            with open(local, "rb") as f:
+                have = zlib.crc32(f.read())
+            if self.checksum(remote, offset) != (have, offset):
+                offset = 0
+        size, _ = self.request(proto.GET, offset, remote.encode())
+        expected, nak_at = offset, None
+        with open(local, "r+b" if offset else "wb") as f:
+            f.seek(offset)
+            f.truncate()
+            while True:
+                reply = self.recv()
+                if reply is None:
+                    self.send(proto.NAK, expected)
+                    nak_at = expected
+                    continue
+                ptype, arg, payload = reply
+                if ptype == proto.END:
+                    break
+                if ptype != proto.DATA or arg != expected:
+                    if nak_at != expected:
+                        nak_at = expected
+                        self.send(proto.NAK, expected)
+                    continue
+                f.write(payload)
+                expected += len(payload)
+                nak_at = None
+                self.send(proto.ACK, expected)
+                if progress:
+                    progress(expected, size)
+        return size - offset
+
+    def put(self, local, remote, progress=None):
+        """Upload local to remote, continuing a matching .part file."""
+        with open(local, "rb") as f:
+            data = f.read()
+        size = len(data)
+        part = remote + proto.PART_SUFFIX
+        try:
+            crc, n = self.checksum(part)
+        except TransferError:
+            n = 0
+        if n and (n > size or crc != zlib.crc32(data[:n])):
+            self.rm(part)
+        offset, _ = self.request(proto.PUT, size, remote.encode())
+        sent = acked = offset
+        window = proto.WINDOW * proto.CHUNK
+        while True:
+            while sent < size and sent - acked < window:
+                chunk = data[sent : sent + proto.CHUNK]
+                self.send(proto.DATA, sent, chunk)
+                sent += len(chunk)
+            reply = self.recv()
+            if reply is None:
+                sent = acked  # resend the whole window
+                continue
+            ptype, arg, _ = reply
+            if ptype == proto.END:
+                return size - offset
+            if ptype == proto.ACK and arg > acked:
+                acked = arg
+                if progress:
+                    progress(acked, size)
+            elif ptype == proto.NAK and arg >= acked:
+                sent = acked = arg
+
+
+# ======================================================
+# Device simulator
+# ======================================================
+class _PtyEnd:
+    """Master side of a pty as the service's stream, damaging 1 in N."""
+
+    def __init__(self, fd, corrupt=0, seed=1):
+        self.fd = fd
+        self.corrupt = corrupt
+        self._rand = random.Random(seed)
+        self.damaged = 0
+
+    def fileno(self):
+        return self.fd
+
+    def _damage(self, buf):
+        if self.corrupt and self._rand.randrange(self.corrupt) == 0:
+            buf[self._rand.randrange(len(buf))] ^= 0x5A
+            self.damaged += 1
+
+    def readinto(self, mv):
+        data = bytearray(os.read(self.fd, len(mv)))
+        if len(data) > 64:
+            self._damage(data)
+        mv[: len(data)] = data
+        return len(data)
+
+    def write(self, mv):
+        data = bytearray(mv)
+        if len(data) > 64:
+            self._damage(data)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view) :]
+
+
+def start_sim(root, corrupt=0):
+    """Serve root on a new pty in a thread; return (port name, end)."""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    end = _PtyEnd(master, corrupt)
+    service = proto.Service(end, end, root.rstrip("/"))
+
+    def run():
+        while True:
+            service.serve()
+
+    threading.Thread(target=run, daemon=True).start()
+    return os.ttyname(slave), end
+
+
+def _progress(done, total):
+    print(f"\r{done}/{total} bytes", end="", file=sys.stderr)
+
+
+def selftest(size, corrupt):
+    """Round-trip random data through the simulator and compare."""
+    root = tempfile.mkdtemp()
+    name, end = start_sim(root, corrupt)
+    data = os.urandom(size)
+    local = os.path.join(root, "upload.bin")
+    back = os.path.join(root, "download.bin")
+    with open(local, "wb") as f:
+        f.write(data)
+    with serial.Serial(name, timeout=0.05) as port:
+        client = Client(port, timeout=0.5)
+        t = time.monotonic()
+        client.put(local, "/ride.log")
+        put_s = time.monotonic() - t
+        t = time.monotonic()
+        client.get("/ride.log", back)
+        get_s = time.monotonic() - t
+    with open(back, "rb") as f:
+        ok = f.read() == data
+    print(
+        f"put {size / put_s / 1e6:.2f} MB/s, get {size / get_s / 1e6:.2f} "
+        f"MB/s, {end.damaged} packets damaged, "
+        f"{'match' if ok else 'MISMATCH'}"
+    )
+    return 0 if ok else 1
+
+
+def _run(client, command, args):
+    if command == "ls":
+        for name, size in client.ls(args[0] if args else "/"):
+            kind = "<dir>" if size == proto.DIR_SIZE else size
+            print(f"{kind:>10}  {name}")
+    elif command == "get":
+        remote = args[0]
+        local = args[1] if len(args) > 1 else os.path.basename(remote)
+        t = time.monotonic()
+        n = client.get(remote, local, _progress)
+        print(f"\n{n} bytes in {time.monotonic() - t:.1f} s")
+    elif command == "put":
+        local, remote = args
+        t = time.monotonic()
+        n = client.put(local, remote, _progress)
+        print(f"\n{n} bytes in {time.monotonic() - t:.1f} s")
+    else:
+        client.rm(args[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("port", help="serial port, 'sim' or 'selftest'")
+    parser.add_argument(
+        "command", nargs="?", choices=("ls", "get", "put", "rm")
+    )
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument(
+        "--no-repl", action="store_true", help="the service is running"
+    )
+    parser.add_argument("--no-reset", action="store_true")
+    parser.add_argument("--root", default=".", help="sim: directory to serve")
+    parser.add_argument("--size", type=int, default=2_000_000)
+    parser.add_argument("--corrupt", type=int, default=0, help="damage 1 in N")
+    args = parser.parse_args(argv)
+
+    if args.port == "selftest":
+        return selftest(args.size, args.corrupt)
+    if args.port == "sim":
+        name, _ = start_sim(args.root, args.corrupt)
+        print(f"serving {args.root} on {name} (Ctrl-C to stop)")
+        while True:
+            time.sleep(1)
+    if args.command is None:
+        parser.error("a command is required")
+
+    with serial.Serial(args.port, args.baud, timeout=0.05) as port:
+        client = Client(port)
+        if not args.no_repl:
+            client.enter()
+        try:
+            _run(client, args.command, args.args)
+        except TransferError as e:
+            print("error:", e)
+            return 1
+        finally:
+            if not args.no_repl:
+                client.leave(reset=not args.no_reset)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())